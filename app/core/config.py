@@ -1,4 +1,6 @@
+import os
 from datetime import timedelta
+from functools import lru_cache
 from pathlib import Path
 from typing import List, Literal
 
@@ -14,6 +16,13 @@ class Settings(BaseSettings):
 
     database_url: str = Field(default=...)
 
+    # Пул соединений SQLAlchemy (на каждый воркер uvicorn): всего до
+    # (DB_POOL_SIZE + DB_MAX_OVERFLOW) × WEB_WORKERS соединений — держите ниже max_connections
+    DB_POOL_SIZE: int = Field(default=5, ge=1)
+    DB_MAX_OVERFLOW: int = Field(default=5, ge=0)
+    DB_POOL_RECYCLE: int = Field(default=1800)
+    DB_POOL_PRE_PING: bool = Field(default=False)
+
     # JWT
     JWT_SECRET_KEY: str = Field(default=...)
     JWT_ALGORITHM: Literal["HS256", "HS384", "HS512", "RS256", "RS384", "RS512"] = Field(
@@ -26,23 +35,73 @@ class Settings(BaseSettings):
     JWT_REFRESH_COOKIE_NAME: str = Field(default=...)
     JWT_COOKIE_SECURE: bool = Field(default=...)
 
+    # Ключ BLAKE2b для хеширования refresh-токенов (не более 64 байт)
+    REFRESH_HASH_KEY: str = Field(default=..., min_length=16, max_length=64)
+
+    # In-process кэш активных refresh-сессий по хэшу токена (TTL в секундах)
+    REFRESH_CACHE_ENABLED: bool = Field(default=False)
+    REFRESH_CACHE_TTL: int = Field(default=5, ge=1)
+    REFRESH_CACHE_MAXSIZE: int = Field(default=10_000, ge=1)
+
+    # Фоновая очистка истекших/отозванных refresh-сессий (интервал в секундах, 0 — выключена)
+    REFRESH_CLEANUP_INTERVAL: int = Field(default=300, ge=0)
+    REFRESH_CLEANUP_RETENTION_DAYS: int = Field(default=1, ge=0)
+
+    # Проверять пароль по фиктивному хэшу, если пользователь не найден (выравнивает время входа)
+    LOGIN_DUMMY_VERIFY: bool = Field(default=True)
+
+    # Argon2id (по умолчанию — рекомендация OWASP: m=19 MiB, t=2, p=1; RFC 9106).
+    # Если задан ARGON2_TARGET_MS, memory_cost подбирается бенчмарком при старте
+    # (в каждом воркере отдельно), а пересчет устаревших хэшей при входе выключается.
+    ARGON2_TIME_COST: int = Field(default=2, ge=1)
+    ARGON2_MEMORY_KIB: int = Field(default=19 * 1024, ge=8)
+    ARGON2_PARALLELISM: int = Field(default=1, ge=1)
+    ARGON2_TARGET_MS: int | None = Field(default=None, ge=0)
+    # Реализация Argon2id: auto — libsodium (PyNaCl), если установлен, иначе argon2-cffi
+    ARGON2_BACKEND: Literal["auto", "libsodium", "argon2-cffi"] = Field(default="auto")
+    # Пул для хеширования: thread (по умолчанию) или process (отдельные процессы, без GIL).
+    # Процессы-воркеры хешируют через argon2-cffi, поэтому process несовместим с libsodium.
+    ARGON2_EXECUTOR: Literal["thread", "process"] = Field(default="thread")
+    # Размер пула Argon2 в одном воркере uvicorn (по умолчанию — ядра, поделенные между воркерами)
+    ARGON2_WORKERS: int | None = Field(default=None, ge=1)
+
+    # Uvicorn (число воркеров по умолчанию — число ядер; reload только для разработки).
+    # При запуске через uvicorn CLI задайте WEB_CONCURRENCY равным --workers.
+    WEB_CONCURRENCY: int | None = Field(default=None, ge=1)
+    UVICORN_RELOAD: bool = Field(default=False)
+
     model_config = SettingsConfigDict(
         env_file=ENV_PATH,
         env_file_encoding="utf-8",
         case_sensitive=False,
         extra="ignore",
+        # Пустые значения из шаблона .env.example (DB_POOL_SIZE= и т.п.) означают значение
+        # по умолчанию, а не пустую строку
+        env_ignore_empty=True,
     )
 
 
-settings = Settings()
+@lru_cache(maxsize=1)
+def get_settings() -> Settings:
+    """Возвращает конфигурацию приложения, загружая ее из окружения один раз."""
+    return Settings()
+
+
+settings = get_settings()
+
+ACCESS_TTL = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRES)
+REFRESH_TTL = timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRES)
+
+# Число процессов uvicorn; по нему делятся ресурсы между воркерами (reload — один процесс)
+WEB_WORKERS = 1 if settings.UVICORN_RELOAD else settings.WEB_CONCURRENCY or os.cpu_count() or 1
 
 auth_config = AuthXConfig(
     JWT_SECRET_KEY=settings.JWT_SECRET_KEY,
     JWT_ALGORITHM=settings.JWT_ALGORITHM,
     JWT_COOKIE_CSRF_PROTECT=settings.JWT_COOKIE_CSRF_PROTECT,
     JWT_TOKEN_LOCATION=settings.JWT_TOKEN_LOCATION,
-    JWT_ACCESS_TOKEN_EXPIRES=timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRES),
-    JWT_REFRESH_TOKEN_EXPIRES=timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRES),
+    JWT_ACCESS_TOKEN_EXPIRES=ACCESS_TTL,
+    JWT_REFRESH_TOKEN_EXPIRES=REFRESH_TTL,
     JWT_REFRESH_COOKIE_NAME=settings.JWT_REFRESH_COOKIE_NAME,
     JWT_COOKIE_SECURE=settings.JWT_COOKIE_SECURE,
 )
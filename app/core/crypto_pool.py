@@ -0,0 +1,82 @@
+from concurrent.futures import ProcessPoolExecutor
+
+from argon2 import PasswordHasher
+from argon2.exceptions import VerificationError
+
+# PasswordHasher процесса-воркера. Задается в initializer, чтобы воркер не импортировал
+# настройки приложения и не повторял калибровку Argon2.
+_worker_hasher: PasswordHasher | None = None
+
+
+def _init_worker(
+    time_cost: int, memory_cost: int, parallelism: int, hash_len: int, salt_len: int
+) -> None:
+    """Создает PasswordHasher в процессе-воркере с параметрами основного процесса."""
+    global _worker_hasher
+    _worker_hasher = PasswordHasher(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+        hash_len=hash_len,
+        salt_len=salt_len,
+    )
+
+
+def _get_worker_hasher() -> PasswordHasher:
+    """Возвращает PasswordHasher процесса-воркера."""
+    if _worker_hasher is None:
+        raise RuntimeError("Argon2 worker process is not initialized")
+    return _worker_hasher
+
+
+def hash_in_worker(password: str) -> str:
+    """Хеширует пароль в процессе-воркере.
+
+    Args:
+        password: Исходный пароль.
+
+    Returns:
+        Хешированный пароль.
+    """
+    hashed: str = _get_worker_hasher().hash(password)
+    return hashed
+
+
+def verify_in_worker(plain_password: str, hashed_password: str) -> bool:
+    """Проверяет пароль в процессе-воркере.
+
+    Args:
+        plain_password: Исходный текст пароля.
+        hashed_password: Хешированный пароль.
+
+    Returns:
+        True если пароль верен, иначе False.
+    """
+    try:
+        result: bool = _get_worker_hasher().verify(hashed_password, plain_password)
+        return result
+    except VerificationError:
+        return False
+
+
+def create_argon2_process_pool(workers: int, hasher: PasswordHasher) -> ProcessPoolExecutor:
+    """Создает пул процессов для Argon2 с параметрами переданного PasswordHasher.
+
+    Args:
+        workers: Количество процессов-воркеров.
+        hasher: PasswordHasher основного процесса, параметры которого копируются в воркеры.
+
+    Returns:
+        Пул процессов, в котором можно выполнять hash_in_worker и verify_in_worker.
+    """
+    return ProcessPoolExecutor(
+        max_workers=workers,
+        initializer=_init_worker,
+        initargs=(
+            hasher.time_cost,
+            hasher.memory_cost,
+            hasher.parallelism,
+            hasher.hash_len,
+            hasher.salt_len,
+        ),
+    )
@@ -1,12 +1,109 @@
-from hashlib import sha256
+import asyncio
+import os
+from base64 import urlsafe_b64encode
+from collections.abc import Callable
+from concurrent.futures import Executor, ThreadPoolExecutor
+from hashlib import blake2b
+from time import perf_counter
 
 from argon2 import PasswordHasher
 from argon2.exceptions import VerificationError
 from authx import AuthX
 
-from app.core.config import auth_config
+from app.core.config import WEB_WORKERS, auth_config, settings
+from app.core.crypto_pool import create_argon2_process_pool, hash_in_worker, verify_in_worker
 
-ph = PasswordHasher()
+try:
+    from nacl import pwhash as nacl_pwhash
+    from nacl.exceptions import InvalidkeyError
+except ImportError:  # pragma: no cover - PyNaCl необязателен, есть fallback на argon2-cffi
+    nacl_pwhash = None  # type: ignore[assignment]
+
+ARGON2_HASH_LEN = 32
+ARGON2_SALT_LEN = 16
+ARGON2_MIN_MEMORY_KIB = 19 * 1024
+ARGON2_MAX_MEMORY_KIB = 1024 * 1024
+
+
+def _create_password_hasher(time_cost: int, memory_cost: int, parallelism: int) -> PasswordHasher:
+    """Создает PasswordHasher с явно заданными параметрами Argon2id."""
+    return PasswordHasher(
+        time_cost=time_cost,
+        memory_cost=memory_cost,
+        parallelism=parallelism,
+        hash_len=ARGON2_HASH_LEN,
+        salt_len=ARGON2_SALT_LEN,
+    )
+
+
+def calibrate_argon2_memory_cost(time_cost: int, parallelism: int, target_ms: int) -> int:
+    """Подбирает memory_cost Argon2 под целевое время хеширования.
+
+    Начиная с ARGON2_MIN_MEMORY_KIB, удваивает memory_cost, пока хеширование
+    укладывается в target_ms.
+
+    Args:
+        time_cost: Количество итераций Argon2.
+        parallelism: Степень параллелизма Argon2.
+        target_ms: Целевое время одного хеширования в миллисекундах.
+
+    Returns:
+        Наибольший memory_cost (KiB), при котором хеширование не дольше target_ms.
+    """
+    memory_cost = ARGON2_MIN_MEMORY_KIB
+    while memory_cost * 2 <= ARGON2_MAX_MEMORY_KIB:
+        hasher = _create_password_hasher(time_cost, memory_cost * 2, parallelism)
+        started = perf_counter()
+        hasher.hash("x")
+        if (perf_counter() - started) * 1000 > target_ms:
+            break
+        memory_cost *= 2
+    return memory_cost
+
+
+def _build_password_hasher() -> PasswordHasher:
+    """Создает PasswordHasher по настройкам ARGON2_* (при необходимости калибрует memory_cost)."""
+    time_cost = settings.ARGON2_TIME_COST
+    parallelism = settings.ARGON2_PARALLELISM
+    memory_cost = settings.ARGON2_MEMORY_KIB
+    if settings.ARGON2_TARGET_MS is not None:
+        memory_cost = calibrate_argon2_memory_cost(
+            time_cost, parallelism, settings.ARGON2_TARGET_MS
+        )
+    return _create_password_hasher(time_cost, memory_cost, parallelism)
+
+
+ph = _build_password_hasher()
+
+# Фиктивный хэш для проверки пароля, когда пользователь не найден: время входа
+# не зависит от того, существует ли учетная запись.
+DUMMY_PASSWORD_HASH: str = ph.hash("dummy_password")
+
+# Argon2-cffi отпускает GIL во время хеширования, поэтому пул потоков дает реальный
+# параллелизм. Пул процессов (ARGON2_EXECUTOR=process) убирает и остаточную борьбу
+# за GIL, но платит за передачу аргументов между процессами. Семафор ограничивает
+# число одновременных хеширований размером пула, чтобы суммарная память
+# (memory_cost × воркеры) оставалась предсказуемой. Каждый воркер uvicorn держит свой
+# пул, поэтому ядра делятся между воркерами: на хост приходится не больше
+# ARGON2_WORKERS × WEB_WORKERS одновременных хеширований.
+ARGON2_WORKERS = settings.ARGON2_WORKERS or max(1, (os.cpu_count() or 1) // WEB_WORKERS)
+_ARGON2_SEMAPHORE = asyncio.Semaphore(ARGON2_WORKERS)
+
+# Ключ BLAKE2b задается один раз; на каждый токен копируется уже проинициализированное состояние
+_REFRESH_HASHER = blake2b(digest_size=32, key=settings.REFRESH_HASH_KEY.encode())
+
+# libsodium (PyNaCl) вычисляет тот же Argon2id с меньшими накладными расходами на вызов
+# и выбирает SIMD-реализацию (AVX2/AVX-512) под процессор, но хеширует только с
+# parallelism=1. Формат хэша (PHC-строка $argon2id$...) совместим с argon2-cffi,
+# поэтому хэши обоих бэкендов проверяются взаимно.
+if settings.ARGON2_BACKEND == "libsodium" and nacl_pwhash is None:
+    raise RuntimeError("ARGON2_BACKEND=libsodium requires PyNaCl")
+if settings.ARGON2_BACKEND == "libsodium" and ph.parallelism != 1:
+    raise RuntimeError("ARGON2_BACKEND=libsodium supports only ARGON2_PARALLELISM=1")
+if settings.ARGON2_BACKEND == "libsodium" and settings.ARGON2_EXECUTOR == "process":
+    raise RuntimeError("ARGON2_BACKEND=libsodium is not supported with ARGON2_EXECUTOR=process")
+_USE_LIBSODIUM = nacl_pwhash is not None and settings.ARGON2_BACKEND != "argon2-cffi"
+_USE_LIBSODIUM_HASH = _USE_LIBSODIUM and ph.parallelism == 1
 
 
 def hash_password(password: str) -> str:
@@ -18,6 +115,10 @@ def hash_password(password: str) -> str:
     Returns:
         Хешированный пароль.
     """
+    if _USE_LIBSODIUM_HASH:
+        return nacl_pwhash.argon2id.str(
+            password.encode(), opslimit=ph.time_cost, memlimit=ph.memory_cost * 1024
+        ).decode("ascii")
     hashed: str = ph.hash(password)
     return hashed
 
@@ -32,6 +133,11 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     Returns:
         True если пароль верен, иначе False.
     """
+    if _USE_LIBSODIUM and hashed_password.startswith("$argon2id$"):
+        try:
+            return nacl_pwhash.argon2id.verify(hashed_password.encode(), plain_password.encode())
+        except InvalidkeyError:
+            return False
     try:
         result: bool = ph.verify(hashed_password, plain_password)
         return result
@@ -39,16 +145,97 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
         return False
 
 
-def hash_refresh_token(refresh_token: str) -> str:
-    """Хеширует переданный refresh token.
+_ARGON2_POOL: Executor
+_hash_in_pool: Callable[[str], str]
+_verify_in_pool: Callable[[str, str], bool]
+if settings.ARGON2_EXECUTOR == "process":
+    _ARGON2_POOL = create_argon2_process_pool(ARGON2_WORKERS, ph)
+    _hash_in_pool, _verify_in_pool = hash_in_worker, verify_in_worker
+else:
+    _ARGON2_POOL = ThreadPoolExecutor(max_workers=ARGON2_WORKERS, thread_name_prefix="argon2")
+    _hash_in_pool, _verify_in_pool = hash_password, verify_password
+
+
+# Калибровка идет в каждом процессе отдельно, и из-за шума замеров воркеры могут получить
+# разный memory_cost. Пересчет хэша при входе тогда переписывал бы хэш при каждом входе
+# через другой воркер, поэтому с ARGON2_TARGET_MS он выключен.
+_REHASH_ON_LOGIN = settings.ARGON2_TARGET_MS is None
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Проверяет, отличаются ли параметры Argon2 хэша от текущих настроек.
+
+    При калибровке memory_cost (ARGON2_TARGET_MS) всегда возвращает False.
+
+    Args:
+        hashed_password: Хешированный пароль.
+
+    Returns:
+        True если хэш нужно пересчитать с текущими параметрами, иначе False.
+    """
+    if not _REHASH_ON_LOGIN:
+        return False
+    result: bool = ph.check_needs_rehash(hashed_password)
+    return result
+
+
+async def hash_password_async(password: str) -> str:
+    """Хеширует пароль в пуле Argon2, не блокируя event loop.
+
+    Args:
+        password: Исходный пароль.
+
+    Returns:
+        Хешированный пароль.
+    """
+    async with _ARGON2_SEMAPHORE:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(_ARGON2_POOL, _hash_in_pool, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Проверяет пароль в пуле Argon2, не блокируя event loop.
+
+    Args:
+        plain_password: Исходный текст пароля.
+        hashed_password: Хешированный пароль.
+
+    Returns:
+        True если пароль верен, иначе False.
+    """
+    async with _ARGON2_SEMAPHORE:
+        loop = asyncio.get_running_loop()
+        return await loop.run_in_executor(
+            _ARGON2_POOL, _verify_in_pool, plain_password, hashed_password
+        )
+
+
+def shutdown_argon2_pool() -> None:
+    """Останавливает пул Argon2, дожидаясь уже начатых хеширований."""
+    _ARGON2_POOL.shutdown(wait=True, cancel_futures=True)
+
+
+def hash_refresh_token(refresh_token: str | bytes) -> str:
+    """Хеширует переданный refresh token ключевым BLAKE2b.
+
+    Ключ (REFRESH_HASH_KEY) не позволяет сопоставить утекшие хэши с токенами
+    без знания секрета. JWT состоит только из ASCII-символов, поэтому строка
+    кодируется в ASCII (не-ASCII токен сразу отвергается UnicodeEncodeError).
+
+    Ключевой BLAKE2b делает один проход по данным, поэтому он быстрее HMAC-SHA256
+    (два прохода SHA-256) даже при аппаратном ускорении SHA-NI.
 
     Args:
-        refresh_token: Исходный refresh token.
+        refresh_token: Исходный refresh token (строка или уже закодированные байты).
 
     Returns:
-        Хешированный refresh token.
+        Хешированный refresh token (43 символа base64url без паддинга).
     """
-    return sha256(refresh_token.encode()).hexdigest()
+    data = refresh_token if isinstance(refresh_token, bytes) else refresh_token.encode("ascii")
+    hasher = _REFRESH_HASHER.copy()
+    hasher.update(data)
+    # 32 байта дают 43 значащих символа base64url и один символ паддинга
+    return urlsafe_b64encode(hasher.digest())[:43].decode("ascii")
 
 
 auth = AuthX(config=auth_config)
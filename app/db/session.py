@@ -5,10 +5,34 @@ from sqlalchemy.ext.asyncio import (
     async_sessionmaker,
     create_async_engine,
 )
+from sqlalchemy.pool import NullPool
 
 from app.core.config import settings
 
-engine = create_async_engine(settings.database_url, echo=False, future=True)
+engine = create_async_engine(
+    settings.database_url,
+    echo=False,
+    future=True,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    pool_pre_ping=settings.DB_POOL_PRE_PING,
+    # Кэши подготовленных выражений asyncpg для горячих запросов репозиториев;
+    # JIT Postgres только замедляет короткие OLTP-запросы.
+    connect_args={
+        "statement_cache_size": 1024,
+        "prepared_statement_cache_size": 512,
+        "server_settings": {"jit": "off"},
+    },
+)
+
+# Отдельный движок без пула для health-проб и фоновой очистки: они не занимают
+# соединения приложения.
+probe_engine = create_async_engine(
+    settings.database_url,
+    poolclass=NullPool,
+    connect_args={"server_settings": {"jit": "off"}},
+)
 
 async_session_factory = async_sessionmaker(bind=engine, autoflush=False, expire_on_commit=False)
 
@@ -1,10 +1,35 @@
+import asyncio
+import contextlib
+import time
+from collections.abc import AsyncIterator
+
 import uvicorn
-from fastapi import Depends, FastAPI
+from fastapi import FastAPI
+from fastapi.responses import ORJSONResponse
 from sqlalchemy import text
-from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.db.session import get_db
+from app.core.config import WEB_WORKERS, settings
+from app.core.security import shutdown_argon2_pool
+from app.db.session import probe_engine
 from app.routes.auth import router as auth_router
+from app.services.refresh_cleanup import run_refresh_cleanup
+
+
+@contextlib.asynccontextmanager
+async def lifespan(_: FastAPI) -> AsyncIterator[None]:
+    """Запускает фоновые задачи приложения и останавливает их при завершении."""
+    cleanup_task = None
+    if settings.REFRESH_CLEANUP_INTERVAL:
+        cleanup_task = asyncio.create_task(run_refresh_cleanup(settings.REFRESH_CLEANUP_INTERVAL))
+    try:
+        yield
+    finally:
+        if cleanup_task is not None:
+            cleanup_task.cancel()
+            with contextlib.suppress(asyncio.CancelledError):
+                await cleanup_task
+        shutdown_argon2_pool()
+
 
 app = FastAPI(
     title="Messenger API",
@@ -13,16 +38,41 @@ app = FastAPI(
         "Включает регистрацию, авторизацию (JWT), управление пользователями и сообщениями."
     ),
     version="0.1.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
+# Успешная проверка БД кэшируется, чтобы частые пробы балансировщика не ходили в БД
+_DB_HEALTH_TTL = 1.0
+_db_healthy_until = 0.0
+
+
+@app.get("/health")
+async def health() -> dict[str, str]:
+    return {"status": "ok"}
+
+
 @app.get("/health/db")
-async def health(db: AsyncSession = Depends(get_db)) -> dict[str, str]:
-    await db.execute(text("SELECT 1"))
+async def health_db() -> dict[str, str]:
+    global _db_healthy_until
+
+    if time.monotonic() >= _db_healthy_until:
+        async with probe_engine.connect() as connection:
+            await connection.execute(text("SELECT 1"))
+        _db_healthy_until = time.monotonic() + _DB_HEALTH_TTL
     return {"status": "ok"}
 
 
 app.include_router(auth_router)
 
 if __name__ == "__main__":
-    uvicorn.run("app.main:app", reload=True)
+    # reload несовместим с несколькими воркерами; каждый воркер — отдельный процесс
+    # со своим пулом Argon2 (ядра делятся между воркерами) и пулом соединений БД.
+    uvicorn.run(
+        "app.main:app",
+        loop="uvloop",
+        http="httptools",
+        reload=settings.UVICORN_RELOAD,
+        workers=None if settings.UVICORN_RELOAD else WEB_WORKERS,
+    )
@@ -0,0 +1,54 @@
+"""add active refresh session hash index
+
+Revision ID: 73d8f58568a6
+Revises: 56b2a9a93990
+Create Date: 2026-10-15 17:56:58.399657
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "73d8f58568a6"
+down_revision: Union[str, Sequence[str], None] = "56b2a9a93990"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # Индексы строятся CONCURRENTLY, чтобы не блокировать запись в refresh_sessions
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_refresh_sessions_hash_active",
+            "refresh_sessions",
+            ["refresh_token_hash"],
+            unique=False,
+            postgresql_where=sa.text("revoked_at IS NULL"),
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            op.f("ix_refresh_sessions_refresh_token_hash"),
+            table_name="refresh_sessions",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    with op.get_context().autocommit_block():
+        op.create_index(
+            op.f("ix_refresh_sessions_refresh_token_hash"),
+            "refresh_sessions",
+            ["refresh_token_hash"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_refresh_sessions_hash_active",
+            table_name="refresh_sessions",
+            postgresql_concurrently=True,
+        )
@@ -2,7 +2,7 @@ import uuid
 from datetime import datetime
 from typing import TYPE_CHECKING
 
-from sqlalchemy import DateTime, ForeignKey, String, func
+from sqlalchemy import DateTime, ForeignKey, Index, String, func, text
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column, relationship
 
@@ -16,11 +16,20 @@ class RefreshSession(Base):
     """ORM-модель JWT Refresh Token."""
 
     __tablename__ = "refresh_sessions"
+    __table_args__ = (
+        # Частичный индекс под get_active_by_hash: только активные сессии
+        Index(
+            "ix_refresh_sessions_hash_active",
+            "refresh_token_hash",
+            postgresql_where=text("revoked_at IS NULL"),
+        ),
+    )
 
     id: Mapped[uuid.UUID] = mapped_column(
         UUID(as_uuid=True),
         primary_key=True,
-        default=uuid.uuid4,
+        # UUIDv7 упорядочен по времени: новые ключи дописываются в правый край B-дерева PK
+        default=uuid.uuid7,
         comment="UUID записи refresh-сессии",
     )
 
@@ -32,9 +41,8 @@ class RefreshSession(Base):
     )
 
     refresh_token_hash: Mapped[str] = mapped_column(
-        String(255),
+        String(43),
         nullable=False,
-        index=True,
         comment="Хэш refresh-токена (не хранить токен в чистом виде)",
     )
 
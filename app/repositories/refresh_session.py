@@ -1,16 +1,79 @@
-from typing import Any, cast
+from datetime import datetime
 from uuid import UUID
 
-from sqlalchemy import func, select, update
-from sqlalchemy.engine import CursorResult
+from sqlalchemy import bindparam, delete, func, insert, lambda_stmt, or_, select, update
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.refresh_session import RefreshSession
 
+# Выражения собираются один раз при импорте; lambda_stmt кэширует их компиляцию.
+_STMT_BY_ID = lambda_stmt(
+    lambda: select(RefreshSession).where(RefreshSession.id == bindparam("session_id"))
+)
+_STMT_ACTIVE_BY_ID = lambda_stmt(
+    lambda: select(RefreshSession)
+    .where(RefreshSession.id == bindparam("session_id"))
+    .where(RefreshSession.revoked_at.is_(None))
+)
+_STMT_ACTIVE_BY_HASH = lambda_stmt(
+    lambda: select(RefreshSession)
+    .where(RefreshSession.refresh_token_hash == bindparam("token_hash"))
+    .where(RefreshSession.revoked_at.is_(None))
+    .where(RefreshSession.expires_at > func.now())
+)
+_STMT_REVOKE = lambda_stmt(
+    lambda: update(RefreshSession)
+    .where(RefreshSession.id == bindparam("session_id"))
+    .where(RefreshSession.revoked_at.is_(None))
+    .values(revoked_at=func.now())
+    .returning(RefreshSession.id)
+)
+# Ротация одним выражением: новая сессия вставляется, только если UPDATE отозвал старую.
+# INSERT ... SELECT строится по таблице (Core), а не по ORM-сущности: ORM-вставка
+# добавляет return_defaults, несовместимый с явным RETURNING.
+_REFRESH_SESSIONS = RefreshSession.metadata.tables[RefreshSession.__tablename__]
+_STMT_ROTATE = lambda_stmt(
+    lambda: insert(_REFRESH_SESSIONS)
+    .from_select(
+        ["id", "user_id", "refresh_token_hash", "expires_at"],
+        select(
+            bindparam("new_id", type_=RefreshSession.id.type),
+            bindparam("new_user_id", type_=RefreshSession.user_id.type),
+            bindparam("new_refresh_token_hash", type_=RefreshSession.refresh_token_hash.type),
+            bindparam("new_expires_at", type_=RefreshSession.expires_at.type),
+        ).select_from(
+            update(RefreshSession)
+            .where(RefreshSession.id == bindparam("old_session_id"))
+            .where(RefreshSession.revoked_at.is_(None))
+            .values(revoked_at=func.now())
+            .returning(RefreshSession.id)
+            .cte("revoked")
+        ),
+        include_defaults=False,
+    )
+    .returning(RefreshSession.id)
+)
+# Удаленные строки считаются в том же запросе: DELETE ... RETURNING внутри CTE.
+_STMT_DELETE_STALE = lambda_stmt(
+    lambda: select(func.count()).select_from(
+        delete(RefreshSession)
+        .where(
+            or_(
+                RefreshSession.expires_at < bindparam("cutoff"),
+                RefreshSession.revoked_at < bindparam("cutoff"),
+            )
+        )
+        .returning(RefreshSession.id)
+        .cte("deleted")
+    )
+)
+
 
 class RefreshSessionRepository:
     """Репозиторий для работы с refresh-сессиями (хранение хэшей refresh-токенов)."""
 
+    __slots__ = ("_db",)
+
     def __init__(self, db: AsyncSession):
         """Создает репозиторий refresh-сессий.
 
@@ -26,11 +89,11 @@ class RefreshSessionRepository:
             refresh_session: Объект refresh-сессии для сохранения.
 
         Returns:
-            Сохраненная refresh-сессия с обновленными полями (например, created_at).
+            Сохраненная refresh-сессия. Серверные значения по умолчанию (created_at)
+            подгружаются тем же INSERT через RETURNING.
         """
         self._db.add(refresh_session)
         await self._db.commit()
-        await self._db.refresh(refresh_session)
         return refresh_session
 
     async def get_by_id(self, session_id: UUID) -> RefreshSession | None:
@@ -42,9 +105,9 @@ class RefreshSessionRepository:
         Returns:
             Refresh-сессия, если найдена, иначе None.
         """
-        stmt = select(RefreshSession).where(RefreshSession.id == session_id)
-        result = await self._db.execute(stmt)
-        return result.scalar_one_or_none()
+        result = await self._db.execute(_STMT_BY_ID, {"session_id": session_id})
+        session: RefreshSession | None = result.scalar_one_or_none()
+        return session
 
     async def get_active_by_id(self, session_id: UUID) -> RefreshSession | None:
         """Возвращает текущую активную refresh-сессию по ее UUID.
@@ -55,29 +118,48 @@ class RefreshSessionRepository:
         Returns:
             Активная refresh-сессия, если найдена, иначе None.
         """
-        stmt = (
-            select(RefreshSession)
-            .where(RefreshSession.id == session_id)
-            .where(RefreshSession.revoked_at.is_(None))
-        )
-        result = await self._db.execute(stmt)
-        return result.scalar_one_or_none()
+        result = await self._db.execute(_STMT_ACTIVE_BY_ID, {"session_id": session_id})
+        session: RefreshSession | None = result.scalar_one_or_none()
+        return session
 
     async def revoke(self, session_id: UUID) -> bool:
         """Отзывает refresh-сессию (ставит revoked_at = now()).
 
         Args:
             session_id: UUID записи refresh-сессии.
+
+        Returns:
+            True, если сессия была активна и отозвана этим вызовом, иначе False.
         """
-        stmt = (
-            update(RefreshSession)
-            .where(RefreshSession.id == session_id)
-            .where(RefreshSession.revoked_at.is_(None))
-            .values(revoked_at=func.now())
+        result = await self._db.execute(_STMT_REVOKE, {"session_id": session_id})
+        revoked_id = result.scalar_one_or_none()
+        await self._db.commit()
+        return revoked_id is not None
+
+    async def rotate(self, old_session_id: UUID, new_session: RefreshSession) -> bool:
+        """Отзывает refresh-сессию и создает вместо нее новую одним запросом.
+
+        Args:
+            old_session_id: UUID отзываемой refresh-сессии.
+            new_session: Новая refresh-сессия (id, user_id, refresh_token_hash, expires_at).
+
+        Returns:
+            True, если старая сессия была активна и заменена новой, иначе False
+            (новая сессия в этом случае не создается).
+        """
+        result = await self._db.execute(
+            _STMT_ROTATE,
+            {
+                "old_session_id": old_session_id,
+                "new_id": new_session.id,
+                "new_user_id": new_session.user_id,
+                "new_refresh_token_hash": new_session.refresh_token_hash,
+                "new_expires_at": new_session.expires_at,
+            },
         )
-        result = cast(CursorResult[Any], await self._db.execute(stmt))
+        new_session_id = result.scalar_one_or_none()
         await self._db.commit()
-        return (result.rowcount or 0) > 0
+        return new_session_id is not None
 
     async def get_active_by_hash(self, token_hash: str) -> RefreshSession | None:
         """Возвращает активную refresh-сессию по хэшу refresh-токена.
@@ -88,11 +170,20 @@ class RefreshSessionRepository:
         Returns:
             Активная refresh-сессия, если найдена, иначе None.
         """
-        stmt = (
-            select(RefreshSession)
-            .where(RefreshSession.refresh_token_hash == token_hash)
-            .where(RefreshSession.revoked_at.is_(None))
-            .where(RefreshSession.expires_at > func.now())
-        )
-        result = await self._db.execute(stmt)
-        return result.scalar_one_or_none()
+        result = await self._db.execute(_STMT_ACTIVE_BY_HASH, {"token_hash": token_hash})
+        session: RefreshSession | None = result.scalar_one_or_none()
+        return session
+
+    async def delete_stale(self, cutoff: datetime) -> int:
+        """Удаляет refresh-сессии, истекшие или отозванные раньше cutoff.
+
+        Args:
+            cutoff: Граница времени; более старые неактивные сессии удаляются.
+
+        Returns:
+            Количество удаленных записей.
+        """
+        result = await self._db.execute(_STMT_DELETE_STALE, {"cutoff": cutoff})
+        deleted: int = result.scalar_one()
+        await self._db.commit()
+        return deleted
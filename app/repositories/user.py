@@ -1,12 +1,25 @@
-from sqlalchemy import select
+from sqlalchemy import bindparam, lambda_stmt, or_, select
+from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
 
+# Выражения собираются один раз при импорте; lambda_stmt кэширует их компиляцию.
+_STMT_BY_EMAIL = lambda_stmt(lambda: select(User).where(User.email == bindparam("email")))
+_STMT_BY_USERNAME = lambda_stmt(lambda: select(User).where(User.username == bindparam("username")))
+# Email и username уникальны, поэтому конфликтующих строк не больше двух.
+_STMT_CONFLICTS = lambda_stmt(
+    lambda: select(User.email, User.username)
+    .where(or_(User.email == bindparam("email"), User.username == bindparam("username")))
+    .limit(2)
+)
+
 
 class UserRepository:
     """Репозиторий для работы с пользователями (User)."""
 
+    __slots__ = ("_db",)
+
     def __init__(self, db: AsyncSession):
         """Создает репозиторий пользователей.
 
@@ -15,18 +28,57 @@ class UserRepository:
         """
         self._db = db
 
-    async def create(self, user: User) -> User:
-        """Создает пользователя.
+    async def create_if_unique(self, user: User) -> User | None:
+        """Создает пользователя, если email и username свободны.
+
+        Выполняет INSERT ... ON CONFLICT DO NOTHING RETURNING за один запрос.
 
         Args:
             user: Пользователь для сохранения.
 
         Returns:
-            Сохраненный пользователь с обновленными полями.
+            Сохраненный пользователь или None, если email или username уже заняты.
+        """
+        stmt = (
+            insert(User)
+            .values(
+                email=user.email,
+                username=user.username,
+                password_hash=user.password_hash,
+            )
+            .on_conflict_do_nothing()
+            .returning(User)
+        )
+        result = await self._db.execute(stmt)
+        created: User | None = result.scalar_one_or_none()
+        await self._db.commit()
+        return created
+
+    async def find_conflicts(self, email: str, username: str) -> list[tuple[str, str]]:
+        """Возвращает email и username пользователей, занявших переданные значения.
+
+        Args:
+            email: Электронная почта.
+            username: Имя пользователя.
+
+        Returns:
+            Список пар (email, username) конфликтующих пользователей.
         """
-        self._db.add(user)
+        result = await self._db.execute(_STMT_CONFLICTS, {"email": email, "username": username})
+        return [(row.email, row.username) for row in result]
+
+    async def update_password_hash(self, user: User, password_hash: str) -> User:
+        """Обновляет хэш пароля пользователя.
+
+        Args:
+            user: Пользователь.
+            password_hash: Новый хэш пароля.
+
+        Returns:
+            Обновленный пользователь.
+        """
+        user.password_hash = password_hash
         await self._db.commit()
-        await self._db.refresh(user)
         return user
 
     async def get_by_email(self, email: str) -> User | None:
@@ -38,9 +90,9 @@ class UserRepository:
         Returns:
             Пользователь, если найден, иначе None.
         """
-        stmt = select(User).where(User.email == email)
-        result = await self._db.execute(stmt)
-        return result.scalar_one_or_none()
+        result = await self._db.execute(_STMT_BY_EMAIL, {"email": email})
+        user: User | None = result.scalar_one_or_none()
+        return user
 
     async def get_by_username(self, username: str) -> User | None:
         """Возвращает пользователя по имени пользователя.
@@ -51,6 +103,6 @@ class UserRepository:
         Returns:
             Пользователь, если найден, иначе None.
         """
-        stmt = select(User).where(User.username == username)
-        result = await self._db.execute(stmt)
-        return result.scalar_one_or_none()
+        result = await self._db.execute(_STMT_BY_USERNAME, {"username": username})
+        user: User | None = result.scalar_one_or_none()
+        return user
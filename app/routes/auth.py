@@ -1,9 +1,14 @@
+from typing import Any
+
 from authx import TokenPayload
 from fastapi import APIRouter, Depends, HTTPException, Request, Response
+from pydantic import BaseModel
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.core.security import auth
 from app.db.session import get_db
+from app.repositories.refresh_session import RefreshSessionRepository
+from app.repositories.user import UserRepository
 from app.schemas.auth import (
     LoginRequest,
     LoginResponse,
@@ -30,10 +35,65 @@ from app.services.errors import (
 
 router = APIRouter(prefix="/auth", tags=["Аутентификация"])
 
+# Атрибуты refresh-cookie вычисляются один раз при импорте (те же, что у AuthX)
+_REFRESH_COOKIE_KW: dict[str, Any] = {
+    "key": auth.config.JWT_REFRESH_COOKIE_NAME,
+    "path": auth.config.JWT_REFRESH_COOKIE_PATH,
+    "domain": auth.config.JWT_COOKIE_DOMAIN,
+    "samesite": auth.config.JWT_COOKIE_SAMESITE,
+    "secure": auth.config.JWT_COOKIE_SECURE,
+    "httponly": auth.config.JWT_COOKIE_HTTP_ONLY,
+    "max_age": auth.config.JWT_COOKIE_MAX_AGE,
+}
+# CSRF-cookie берется из payload токена, поэтому в этом режиме работает AuthX
+_SET_CSRF_COOKIE = auth.config.JWT_COOKIE_CSRF_PROTECT and auth.config.JWT_CSRF_IN_COOKIES
+
+
+def _get_user_repository(db: AsyncSession = Depends(get_db)) -> UserRepository:
+    """Создает репозиторий пользователей на время запроса."""
+    return UserRepository(db)
+
+
+def _get_session_repository(db: AsyncSession = Depends(get_db)) -> RefreshSessionRepository:
+    """Создает репозиторий refresh-сессий на время запроса."""
+    return RefreshSessionRepository(db)
+
+
+def _json_response(model: BaseModel, status_code: int = 200) -> Response:
+    """Сериализует модель ответа в JSON средствами pydantic-core.
+
+    Модели ответов собираются из доверенных данных сервера, поэтому роуты
+    объявлены с response_model=None: FastAPI не валидирует ответ повторно
+    и не обходит его jsonable_encoder.
+
+    Args:
+        model: Модель ответа.
+        status_code: HTTP-статус ответа.
+
+    Returns:
+        JSON-ответ.
+    """
+    return Response(
+        content=model.model_dump_json(), status_code=status_code, media_type="application/json"
+    )
+
+
+def _set_refresh_cookie(response: Response, refresh_token: str) -> None:
+    """Устанавливает refresh-токен в HttpOnly cookie ответа.
+
+    Args:
+        response: HTTP-ответ.
+        refresh_token: Новый refresh-токен.
+    """
+    if _SET_CSRF_COOKIE:
+        auth.set_refresh_cookies(refresh_token, response)
+    else:
+        response.set_cookie(value=refresh_token, **_REFRESH_COOKIE_KW)
+
 
 @router.post(
     "/register",
-    response_model=RegisterResponse,
+    response_model=None,
     status_code=201,
     summary="Регистрация пользователя",
     description=(
@@ -44,27 +104,38 @@ router = APIRouter(prefix="/auth", tags=["Аутентификация"])
         "- пароль сохраняется только в виде хэша"
     ),
     responses={
-        201: {"description": "Пользователь зарегистрирован."},
+        201: {"model": RegisterResponse, "description": "Пользователь зарегистрирован."},
         409: {"description": "Email или username уже заняты."},
         422: {"description": "Ошибка валидации входных данных."},
     },
 )
 async def register(
-    payload: RegisterRequest, db: AsyncSession = Depends(get_db)
-) -> RegisterResponse:
+    payload: RegisterRequest,
+    db: AsyncSession = Depends(get_db),
+    user_repo: UserRepository = Depends(_get_user_repository),
+) -> Response:
     try:
-        user = await register_user(db, payload)
+        user = await register_user(db, payload, user_repo)
     except UsernameContainsWhitespaceError as error:
         raise HTTPException(status_code=422, detail=error.reason) from error
     except (EmailAlreadyExistsError, UsernameAlreadyExistsError) as error:
         raise HTTPException(status_code=409, detail=error.reason) from error
     else:
-        return RegisterResponse.model_validate(user)
+        # Данные пришли из БД и уже валидны — повторная валидация не нужна
+        return _json_response(
+            RegisterResponse.model_construct(
+                id=user.id,
+                email=user.email,
+                username=user.username,
+                created_at=user.created_at,
+            ),
+            status_code=201,
+        )
 
 
 @router.post(
     "/login",
-    response_model=LoginResponse,
+    response_model=None,
     summary="Вход в систему",
     description=(
         "Аутентификация по email или username.\n\n"
@@ -73,28 +144,36 @@ async def register(
         "- refresh-токен устанавливается в HttpOnly cookie"
     ),
     responses={
-        200: {"description": "Успешный вход."},
+        200: {"model": LoginResponse, "description": "Успешный вход."},
         401: {"description": "Неверный логин или пароль."},
         422: {"description": "Ошибка валидации входных данных."},
     },
 )
 async def login(
-    payload: LoginRequest, response: Response, db: AsyncSession = Depends(get_db)
-) -> LoginResponse:
+    payload: LoginRequest,
+    db: AsyncSession = Depends(get_db),
+    user_repo: UserRepository = Depends(_get_user_repository),
+    session_repo: RefreshSessionRepository = Depends(_get_session_repository),
+) -> Response:
     try:
         access_token, refresh_token = await login_user(
-            db=db, login=payload.login, password=payload.password
+            db=db,
+            login=payload.login,
+            password=payload.password,
+            user_repo=user_repo,
+            session_repo=session_repo,
         )
-        auth.set_refresh_cookies(refresh_token, response)
     except (InvalidUsernameError, InvalidPasswordError) as error:
         raise HTTPException(status_code=401, detail="Invalid credentials") from error
     else:
-        return LoginResponse(access_token=access_token)
+        response = _json_response(LoginResponse.model_construct(access_token=access_token))
+        _set_refresh_cookie(response, refresh_token)
+        return response
 
 
 @router.post(
     "/refresh",
-    response_model=LoginResponse,
+    response_model=None,
     summary="Обновление access-токена",
     description=(
         "Обновляет access-токен по refresh-токену из HttpOnly cookie.\n\n"
@@ -104,22 +183,23 @@ async def login(
         "- устанавливает новый refresh-токен в cookie"
     ),
     responses={
-        200: {"description": "Токены обновлены."},
+        200: {"model": LoginResponse, "description": "Токены обновлены."},
         401: {"description": "Refresh-токен недействителен или сессия неактивна."},
         422: {"description": "Ошибка валидации / отсутствует cookie."},
     },
 )
 async def refresh(
-    response: Response,
     payload: TokenPayload = Depends(auth.refresh_token_required),
     refresh_token_raw: RefreshTokenRaw = auth.REFRESH_TOKEN,
     db: AsyncSession = Depends(get_db),
-) -> LoginResponse:
+    session_repo: RefreshSessionRepository = Depends(_get_session_repository),
+) -> Response:
     try:
         access_token, new_refresh_token = await refresh_tokens(
             db=db,
             refresh_token_raw=refresh_token_raw,
             payload=payload,
+            session_repo=session_repo,
         )
     except (
         InvalidRefreshTokenError,
@@ -128,8 +208,9 @@ async def refresh(
     ) as error:
         raise HTTPException(status_code=401, detail=error.reason) from error
     else:
-        auth.set_refresh_cookies(new_refresh_token, response)
-        return LoginResponse(access_token=access_token)
+        response = _json_response(LoginResponse.model_construct(access_token=access_token))
+        _set_refresh_cookie(response, new_refresh_token)
+        return response
 
 
 @router.post(
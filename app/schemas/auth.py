@@ -1,7 +1,42 @@
 from datetime import datetime
+from typing import Annotated
 from uuid import UUID
 
-from pydantic import BaseModel, ConfigDict, EmailStr, Field
+from emval import EmailValidator
+from pydantic import AfterValidator, BaseModel, ConfigDict, Field
+
+# Синтаксическая проверка email (emval, Rust) без DNS-запросов на доставляемость.
+_email_validator = EmailValidator(deliverable_address=False)
+
+
+def _validate_email(value: str) -> str:
+    """Проверяет email и возвращает его нормализованную форму.
+
+    Args:
+        value: Email из запроса.
+
+    Returns:
+        Нормализованный email.
+
+    Raises:
+        ValueError: Если email некорректен.
+    """
+    try:
+        email = _email_validator.validate_email(value)
+    except SyntaxError as error:
+        raise ValueError(f"value is not a valid email address: {error}") from error
+    if "." not in email.domain_name:
+        raise ValueError("value is not a valid email address: domain must contain a period")
+    normalized: str = email.normalized
+    return normalized
+
+
+FastEmailStr = Annotated[
+    str,
+    AfterValidator(_validate_email),
+    # Только format: остальная схема (type, maxLength из Field) строится pydantic как обычно
+    Field(json_schema_extra={"format": "email"}),
+]
 
 
 class RegisterRequest(BaseModel):
@@ -9,7 +44,7 @@ class RegisterRequest(BaseModel):
 
     model_config = ConfigDict(extra="forbid", str_strip_whitespace=True)
 
-    email: EmailStr = Field(
+    email: FastEmailStr = Field(
         max_length=255,
         description="Электронная почта",
         examples=["abcd@gmail.com"],
@@ -34,7 +69,7 @@ class RegisterResponse(BaseModel):
     model_config = ConfigDict(from_attributes=True)
 
     id: UUID
-    email: EmailStr
+    email: FastEmailStr
     username: str
     created_at: datetime
 
@@ -1,14 +1,21 @@
+import hmac
 import re
 import uuid
-from datetime import datetime, timedelta, timezone
+from datetime import datetime, timezone
 from typing import Protocol, TypeAlias
 
 from authx import TokenPayload
-from sqlalchemy.exc import IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from app.core.config import settings
-from app.core.security import auth, hash_password, hash_refresh_token, verify_password
+from app.core.config import REFRESH_TTL, settings
+from app.core.security import (
+    DUMMY_PASSWORD_HASH,
+    auth,
+    hash_password_async,
+    hash_refresh_token,
+    password_needs_rehash,
+    verify_password_async,
+)
 from app.models.refresh_session import RefreshSession
 from app.models.user import User
 from app.repositories.refresh_session import RefreshSessionRepository
@@ -24,6 +31,12 @@ from app.services.errors import (
     UsernameAlreadyExistsError,
     UsernameContainsWhitespaceError,
 )
+from app.services.refresh_cache import (
+    ActiveRefreshSession,
+    cache_session,
+    get_cached_session,
+    invalidate_session,
+)
 
 
 class RefreshTokenLike(Protocol):
@@ -32,6 +45,10 @@ class RefreshTokenLike(Protocol):
 
 RefreshTokenRaw: TypeAlias = str | RefreshTokenLike
 
+# Допустимые форматы логина; компилируются один раз при импорте.
+_EMAIL_RE = re.compile(r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$")
+_LOGIN_RE = re.compile(r"^[a-zA-Z0-9_]{3,20}$")
+
 
 def _normalize_refresh_token(refresh_token_raw: RefreshTokenRaw) -> str:
     """Нормализует refresh-токен до строкового представления.
@@ -42,21 +59,46 @@ def _normalize_refresh_token(refresh_token_raw: RefreshTokenRaw) -> str:
     Returns:
         Строковое представление refresh-токена.
     """
-    return (
-        refresh_token_raw.token if hasattr(refresh_token_raw, "token") else str(refresh_token_raw)
-    )
+    # Строка — самый частый случай (cookie при logout), проверяется первой.
+    if isinstance(refresh_token_raw, str):
+        return refresh_token_raw
+    return refresh_token_raw.token
+
+
+async def _get_active_session(
+    session_repo: RefreshSessionRepository, token_hash: str
+) -> ActiveRefreshSession | None:
+    """Возвращает активную refresh-сессию по хэшу токена, сначала проверяя кэш.
+
+    Args:
+        session_repo: Репозиторий refresh-сессий.
+        token_hash: Хэш refresh-токена.
+
+    Returns:
+        Снимок активной refresh-сессии, если найдена, иначе None.
+    """
+    cached = get_cached_session(token_hash)
+    if cached is not None:
+        return cached
+
+    session = await session_repo.get_active_by_hash(token_hash)
+    if session is None:
+        return None
+    return cache_session(session)
 
 
 async def _validate_refresh_session(
-    db: AsyncSession, refresh_token_raw: RefreshTokenRaw, payload: TokenPayload
-) -> RefreshSession:
+    session_repo: RefreshSessionRepository,
+    refresh_token_raw: RefreshTokenRaw,
+    payload: TokenPayload,
+) -> ActiveRefreshSession:
     """Валидирует refresh-токен и возвращает связанную refresh-сессию.
 
     Проверяет существование активной refresh-сессии, срок её действия и
     соответствие пользователя данным из JWT (uid).
 
     Args:
-        db: Асинхронная сессия базы данных.
+        session_repo: Репозиторий refresh-сессий.
         refresh_token_raw: Исходный refresh-токен (не хэшированный).
         payload: Payload валидированного refresh JWT.
 
@@ -74,8 +116,7 @@ async def _validate_refresh_session(
 
     refresh_token_str = _normalize_refresh_token(refresh_token_raw)
     token_hash = hash_refresh_token(refresh_token_str)
-    session_repo = RefreshSessionRepository(db)
-    session = await session_repo.get_active_by_hash(token_hash)
+    session = await _get_active_session(session_repo, token_hash)
 
     # Проверка существования такой сессии
     if not session:
@@ -83,22 +124,27 @@ async def _validate_refresh_session(
 
     uid = payload.sub
 
-    # Проверка связи uid и user_id данной сессии
-    if uid != str(session.user_id):
+    # Проверка связи uid и user_id данной сессии (сравнение за постоянное время). Байты,
+    # а не str: compare_digest отвергает не-ASCII строки TypeError вместо несовпадения.
+    if uid is None or not hmac.compare_digest(uid.encode(), str(session.user_id).encode()):
         raise RefreshSessionMismatchError()
 
     return session
 
 
-async def register_user(db: AsyncSession, payload: RegisterRequest) -> User:
+async def register_user(
+    db: AsyncSession, payload: RegisterRequest, user_repo: UserRepository | None = None
+) -> User:
     """Регистрирует нового пользователя в системе.
 
-    Выполняет бизнес-валидацию данных, проверяет уникальность email и username,
-    хеширует пароль и сохраняет пользователя в базе данных.
+    Выполняет бизнес-валидацию данных, хеширует пароль и сохраняет пользователя
+    одним INSERT ... ON CONFLICT DO NOTHING. Если вставка пропущена из-за
+    конфликта уникальности, отдельным запросом определяет, какое поле занято.
 
     Args:
         db: Асинхронная сессия базы данных.
         payload: Данные для регистрации пользователя.
+        user_repo: Репозиторий пользователей (по умолчанию создается по db).
 
     Returns:
         Созданный пользователь.
@@ -112,41 +158,37 @@ async def register_user(db: AsyncSession, payload: RegisterRequest) -> User:
     if " " in payload.username:
         raise UsernameContainsWhitespaceError(payload.username)
 
-    # Проверка уникальности пользовательских данных
-    user_repo = UserRepository(db)
-
-    # Уникальность электронной почты
+    user_repo = user_repo or UserRepository(db)
     email = str(payload.email)
 
-    if await user_repo.get_by_email(email):
-        raise EmailAlreadyExistsError(email)
-
-    # Уникальность имени пользователя
-    if await user_repo.get_by_username(payload.username):
-        raise UsernameAlreadyExistsError(payload.username)
-
     # Хеширование пароля
-    password_hash = hash_password(payload.password)
-
-    # Создание пользователя
-    user = User(
-        email=email,
-        username=payload.username,
-        password_hash=password_hash,
+    password_hash = await hash_password_async(payload.password)
+
+    # Создание пользователя, если email и username свободны
+    user = await user_repo.create_if_unique(
+        User(
+            email=email,
+            username=payload.username,
+            password_hash=password_hash,
+        )
     )
+    if user is not None:
+        return user
 
-    try:
-        return await user_repo.create(user)
-    except IntegrityError as error:
-        constraint = getattr(error.orig, "constraint_name", None)
-        if constraint == "uq_users_email":
-            raise EmailAlreadyExistsError(email)
-        if constraint == "uq_users_username":
-            raise UsernameAlreadyExistsError(payload.username)
-        raise
+    # Уникальность электронной почты и имени пользователя
+    conflicts = await user_repo.find_conflicts(email, payload.username)
+    if any(conflict_email == email for conflict_email, _ in conflicts):
+        raise EmailAlreadyExistsError(email)
+    raise UsernameAlreadyExistsError(payload.username)
 
 
-async def login_user(db: AsyncSession, login: str, password: str) -> tuple[str, str]:
+async def login_user(
+    db: AsyncSession,
+    login: str,
+    password: str,
+    user_repo: UserRepository | None = None,
+    session_repo: RefreshSessionRepository | None = None,
+) -> tuple[str, str]:
     """Аутентифицирует пользователя и создаёт новую refresh-сессию.
 
     Выполняет вход по email или username, проверяет пароль, создаёт access
@@ -156,6 +198,8 @@ async def login_user(db: AsyncSession, login: str, password: str) -> tuple[str,
         db: Асинхронная сессия базы данных.
         login: Email или username пользователя.
         password: Пароль пользователя.
+        user_repo: Репозиторий пользователей (по умолчанию создается по db).
+        session_repo: Репозиторий refresh-сессий (по умолчанию создается по db).
 
     Returns:
         Кортеж из access-токена и refresh-токена.
@@ -164,31 +208,42 @@ async def login_user(db: AsyncSession, login: str, password: str) -> tuple[str,
         InvalidUsernameError: Если пользователь не найден.
         InvalidPasswordError: Если пароль неверен.
     """
-    email_pattern = r"^[a-zA-Z0-9._%+-]+@[a-zA-Z0-9.-]+\.[a-zA-Z]{2,}$"
-    login_pattern = r"^[a-zA-Z0-9_]{3,20}$"
+    user_repo = user_repo or UserRepository(db)
 
-    user_repo = UserRepository(db)
-
-    if re.fullmatch(email_pattern, login):
+    # Email обязан содержать "@", а username не может, поэтому проверяется
+    # только один формат и выполняется поиск по одному уникальному индексу.
+    if "@" in login:
+        if not _EMAIL_RE.fullmatch(login):
+            raise InvalidUsernameError()
         user = await user_repo.get_by_email(login)
-    elif re.fullmatch(login_pattern, login):
-        user = await user_repo.get_by_username(login)
     else:
-        raise InvalidUsernameError()
+        if not _LOGIN_RE.fullmatch(login):
+            raise InvalidUsernameError()
+        user = await user_repo.get_by_username(login)
 
-    # Проверка существует ли пользователь по email или login
+    # Проверка существует ли пользователь по email или login.
+    # По умолчанию пароль проверяется и для несуществующего пользователя (по заранее
+    # вычисленному фиктивному хэшу), чтобы время ответа не раскрывало наличие учетной
+    # записи. LOGIN_DUMMY_VERIFY=false экономит Argon2 на таких попытках.
     if not user:
+        if settings.LOGIN_DUMMY_VERIFY:
+            await verify_password_async(password, DUMMY_PASSWORD_HASH)
         raise InvalidUsernameError()
 
     # Проверка корректности пароля.
-    if not verify_password(password, user.password_hash):
+    if not await verify_password_async(password, user.password_hash):
         raise InvalidPasswordError()
 
-    session_id = uuid.uuid4()
+    # Пересчет хэша, если он создан с устаревшими параметрами Argon2.
+    if password_needs_rehash(user.password_hash):
+        password_hash = await hash_password_async(password)
+        await user_repo.update_password_hash(user, password_hash)
+
+    session_id = uuid.uuid7()
     access_token = auth.create_access_token(uid=str(user.id))
     refresh_token = auth.create_refresh_token(uid=str(user.id), sid=str(session_id))
     refresh_token_hash = hash_refresh_token(refresh_token)
-    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRES)
+    expires_at = datetime.now(timezone.utc) + REFRESH_TTL
 
     refresh_session = RefreshSession(
         id=session_id,
@@ -198,14 +253,17 @@ async def login_user(db: AsyncSession, login: str, password: str) -> tuple[str,
         revoked_at=None,
     )
 
-    session_repo = RefreshSessionRepository(db)
+    session_repo = session_repo or RefreshSessionRepository(db)
     await session_repo.create(refresh_session)
 
     return access_token, refresh_token
 
 
 async def refresh_tokens(
-    db: AsyncSession, refresh_token_raw: RefreshTokenRaw, payload: TokenPayload
+    db: AsyncSession,
+    refresh_token_raw: RefreshTokenRaw,
+    payload: TokenPayload,
+    session_repo: RefreshSessionRepository | None = None,
 ) -> tuple[str, str]:
     """Обновляет access-токен с ротацией refresh-сессии.
 
@@ -216,26 +274,26 @@ async def refresh_tokens(
         db: Асинхронная сессия базы данных.
         refresh_token_raw: Исходный refresh-токен (не хэшированный).
         payload: Payload валидированного refresh JWT.
+        session_repo: Репозиторий refresh-сессий (по умолчанию создается по db).
 
     Returns:
         Кортеж из нового access-токена и нового refresh-токена.
 
     Raises:
         InvalidRefreshTokenError: Если refresh-токен невалиден.
-        RefreshSessionNotFoundError: Если refresh-сессия не найдена.
+        RefreshSessionNotFoundError: Если refresh-сессия не найдена или уже отозвана.
         RefreshSessionMismatchError: Если данные токена не соответствуют сессии.
     """
-    old_session = await _validate_refresh_session(db, refresh_token_raw, payload)
-    session_repo = RefreshSessionRepository(db)
-    await session_repo.revoke(old_session.id)
+    session_repo = session_repo or RefreshSessionRepository(db)
+    old_session = await _validate_refresh_session(session_repo, refresh_token_raw, payload)
 
-    new_session_id = uuid.uuid4()
+    new_session_id = uuid.uuid7()
     access_token = auth.create_access_token(uid=str(old_session.user_id))
     new_refresh_token = auth.create_refresh_token(
         uid=str(old_session.user_id), sid=str(new_session_id)
     )
     new_hash = hash_refresh_token(new_refresh_token)
-    expires_at = datetime.now(timezone.utc) + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRES)
+    expires_at = datetime.now(timezone.utc) + REFRESH_TTL
 
     new_session = RefreshSession(
         id=new_session_id,
@@ -245,11 +303,21 @@ async def refresh_tokens(
         revoked_at=None,
     )
 
-    await session_repo.create(new_session)
+    rotated = await session_repo.rotate(old_session.id, new_session)
+    invalidate_session(old_session.refresh_token_hash)
+
+    # Сессию уже отозвал параллельный запрос (возможно, по устаревшей записи кэша)
+    if not rotated:
+        raise RefreshSessionNotFoundError()
+
     return access_token, new_refresh_token
 
 
-async def logout_user_idempotent(db: AsyncSession, refresh_token_raw: RefreshTokenRaw) -> None:
+async def logout_user_idempotent(
+    db: AsyncSession,
+    refresh_token_raw: RefreshTokenRaw,
+    session_repo: RefreshSessionRepository | None = None,
+) -> None:
     """Идемпотентно завершает refresh-сессию пользователя.
 
     Пытается отозвать активную refresh-сессию, связанную с переданным
@@ -259,14 +327,16 @@ async def logout_user_idempotent(db: AsyncSession, refresh_token_raw: RefreshTok
     Args:
         db: Асинхронная сессия базы данных.
         refresh_token_raw: Исходный refresh-токен из HttpOnly cookie.
+        session_repo: Репозиторий refresh-сессий (по умолчанию создается по db).
     """
     refresh_token_str = _normalize_refresh_token(refresh_token_raw)
     token_hash = hash_refresh_token(refresh_token_str)
 
-    session_repo = RefreshSessionRepository(db)
-    session = await session_repo.get_active_by_hash(token_hash)
+    session_repo = session_repo or RefreshSessionRepository(db)
+    session = await _get_active_session(session_repo, token_hash)
 
     if not session:
         return
 
     await session_repo.revoke(session.id)
+    invalidate_session(token_hash)
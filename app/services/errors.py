@@ -7,6 +7,8 @@ from typing import ClassVar
 class UserError(Exception):
     """Базовая ошибка при работе с пользователем."""
 
+    __slots__ = ()
+
     reason: ClassVar[str]
 
     def __init__(self, message: str) -> None:
@@ -16,6 +18,8 @@ class UserError(Exception):
 class ServiceError(Exception):
     """Базовая ошибка при работе с сервисом."""
 
+    __slots__ = ()
+
     reason: ClassVar[str]
 
     def __init__(self, message: str) -> None:
@@ -28,6 +32,8 @@ class ServiceError(Exception):
 class UsernameContainsWhitespaceError(UserError):
     """Имя пользователя содержит пробелы."""
 
+    __slots__ = ()
+
     reason: ClassVar[str] = "username_contains_whitespace"
 
     def __init__(self, username: str) -> None:
@@ -37,6 +43,8 @@ class UsernameContainsWhitespaceError(UserError):
 class EmailAlreadyExistsError(UserError):
     """Пользователь с такой электронной почтой уже существует."""
 
+    __slots__ = ()
+
     reason: ClassVar[str] = "email_already_exists"
 
     def __init__(self, email: str) -> None:
@@ -46,6 +54,8 @@ class EmailAlreadyExistsError(UserError):
 class UsernameAlreadyExistsError(UserError):
     """Имя пользователя уже существует."""
 
+    __slots__ = ()
+
     reason: ClassVar[str] = "username_already_exists"
 
     def __init__(self, username: str) -> None:
@@ -58,6 +68,8 @@ class UsernameAlreadyExistsError(UserError):
 class InvalidUsernameError(ServiceError):
     """Пользователя с таким именем не существует."""
 
+    __slots__ = ()
+
     reason: ClassVar[str] = "invalid_username"
 
     def __init__(self) -> None:
@@ -67,6 +79,8 @@ class InvalidUsernameError(ServiceError):
 class InvalidPasswordError(ServiceError):
     """Неверный пароль."""
 
+    __slots__ = ()
+
     reason: ClassVar[str] = "invalid_password"
 
     def __init__(self) -> None:
@@ -76,6 +90,8 @@ class InvalidPasswordError(ServiceError):
 class InvalidRefreshTokenError(ServiceError):
     """Refresh token не валиден как токен."""
 
+    __slots__ = ()
+
     reason: ClassVar[str] = "invalid_refresh_token"
 
     def __init__(self) -> None:
@@ -88,6 +104,8 @@ class InvalidRefreshTokenError(ServiceError):
 class RefreshSessionNotFoundError(ServiceError):
     """Refresh сессии не существует."""
 
+    __slots__ = ()
+
     reason: ClassVar[str] = "refresh_session_not_found"
 
     def __init__(self) -> None:
@@ -97,6 +115,8 @@ class RefreshSessionNotFoundError(ServiceError):
 class RefreshSessionMismatchError(ServiceError):
     """Uid/sid mismatch между токеном и сессией."""
 
+    __slots__ = ()
+
     reason: ClassVar[str] = "refresh_session_mismatch"
 
     def __init__(self) -> None:
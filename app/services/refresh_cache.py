@@ -0,0 +1,73 @@
+from datetime import datetime, timezone
+from typing import NamedTuple
+from uuid import UUID
+
+from cachetools import TTLCache
+
+from app.core.config import settings
+from app.models.refresh_session import RefreshSession
+
+
+class ActiveRefreshSession(NamedTuple):
+    """Снимок активной refresh-сессии, не привязанный к ORM-сессии."""
+
+    id: UUID
+    user_id: UUID
+    refresh_token_hash: str
+    expires_at: datetime
+
+
+_cache: TTLCache[str, ActiveRefreshSession] = TTLCache(
+    maxsize=settings.REFRESH_CACHE_MAXSIZE, ttl=settings.REFRESH_CACHE_TTL
+)
+
+
+def get_cached_session(token_hash: str) -> ActiveRefreshSession | None:
+    """Возвращает активную refresh-сессию из кэша.
+
+    Args:
+        token_hash: Хэш refresh-токена.
+
+    Returns:
+        Снимок refresh-сессии, если он есть в кэше и сессия не истекла, иначе None.
+    """
+    if not settings.REFRESH_CACHE_ENABLED:
+        return None
+
+    session = _cache.get(token_hash)
+    if session is not None and session.expires_at <= datetime.now(timezone.utc):
+        _cache.pop(token_hash, None)
+        return None
+    return session
+
+
+def cache_session(refresh_session: RefreshSession) -> ActiveRefreshSession:
+    """Сохраняет снимок найденной в БД активной refresh-сессии в кэш.
+
+    Кэшируются только найденные сессии, поэтому перебор несуществующих токенов
+    не вытесняет полезные записи.
+
+    Args:
+        refresh_session: Активная refresh-сессия из БД.
+
+    Returns:
+        Снимок refresh-сессии.
+    """
+    session = ActiveRefreshSession(
+        id=refresh_session.id,
+        user_id=refresh_session.user_id,
+        refresh_token_hash=refresh_session.refresh_token_hash,
+        expires_at=refresh_session.expires_at,
+    )
+    if settings.REFRESH_CACHE_ENABLED:
+        _cache[session.refresh_token_hash] = session
+    return session
+
+
+def invalidate_session(token_hash: str) -> None:
+    """Удаляет refresh-сессию из кэша (после отзыва).
+
+    Args:
+        token_hash: Хэш refresh-токена.
+    """
+    _cache.pop(token_hash, None)
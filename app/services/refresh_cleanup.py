@@ -0,0 +1,59 @@
+import asyncio
+import logging
+from datetime import datetime, timedelta, timezone
+
+from sqlalchemy import func, select
+from sqlalchemy.ext.asyncio import AsyncConnection, AsyncSession
+
+from app.core.config import settings
+from app.db.session import probe_engine
+from app.repositories.refresh_session import RefreshSessionRepository
+
+logger = logging.getLogger(__name__)
+
+# Ключ advisory-блокировки Postgres: очистку выполняет только воркер, который ее держит
+_CLEANUP_LOCK_KEY = 730_202_501
+_STMT_TRY_LOCK = select(func.pg_try_advisory_lock(_CLEANUP_LOCK_KEY))
+
+
+async def purge_stale_refresh_sessions(connection: AsyncConnection) -> int:
+    """Удаляет refresh-сессии, истекшие или отозванные дольше срока хранения.
+
+    Args:
+        connection: Соединение, на котором выполняется очистка.
+
+    Returns:
+        Количество удаленных записей.
+    """
+    cutoff = datetime.now(timezone.utc) - timedelta(days=settings.REFRESH_CLEANUP_RETENTION_DAYS)
+    async with AsyncSession(bind=connection) as session:
+        return await RefreshSessionRepository(session).delete_stale(cutoff)
+
+
+async def run_refresh_cleanup(interval: int) -> None:
+    """Периодически очищает таблицу refresh-сессий до отмены задачи.
+
+    Таблица растет монотонно, а неактивные строки раздувают индексы, по которым
+    ищется активная сессия при refresh/logout.
+
+    Задача запускается в каждом воркере uvicorn, но очистку выполняет только тот,
+    кто захватил advisory-блокировку; он держит ее на отдельном соединении, пока
+    работает. Остальные раз в interval пробуют ее захватить, чтобы продолжить
+    очистку, если этот воркер завершится.
+
+    Args:
+        interval: Пауза между запусками очистки в секундах.
+    """
+    while True:
+        try:
+            async with probe_engine.connect() as connection:
+                if await connection.scalar(_STMT_TRY_LOCK):
+                    # Блокировка уровня сессии переживает commit и снимается с соединением
+                    await connection.commit()
+                    while True:
+                        deleted = await purge_stale_refresh_sessions(connection)
+                        logger.info("Removed %d stale refresh sessions", deleted)
+                        await asyncio.sleep(interval)
+        except Exception:
+            logger.exception("Refresh sessions cleanup failed")
+        await asyncio.sleep(interval)
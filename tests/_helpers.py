@@ -0,0 +1,53 @@
+import re
+
+from httpx import Response
+from pydantic import TypeAdapter
+
+from app.core.security import auth
+from app.schemas.auth import LoginResponse
+
+# Валидатор ответа собирается один раз при импорте модуля.
+_LOGIN_RESPONSE = TypeAdapter(LoginResponse)
+
+# Refresh-cookie: значение до первого ";" и обязательный флаг HttpOnly среди атрибутов.
+_REFRESH_COOKIE_RE = re.compile(
+    rf"^{re.escape(auth.config.JWT_REFRESH_COOKIE_NAME)}=([^;]+);.*\bhttponly\b",
+    re.IGNORECASE,
+)
+
+
+def refresh_cookie(response: Response) -> str:
+    """Находит refresh-cookie в заголовках Set-Cookie и проверяет флаг HttpOnly.
+
+    Args:
+        response: Ответ, который выставляет refresh-cookie.
+
+    Returns:
+        Значение refresh-токена из cookie.
+    """
+    for set_cookie in response.headers.get_list("set-cookie"):
+        match = _REFRESH_COOKIE_RE.match(set_cookie)
+        if match:
+            return match.group(1)
+    raise AssertionError("httponly refresh cookie not set")
+
+
+def assert_login_ok(response: Response) -> LoginResponse:
+    """Проверяет успешный ответ на вход: тело LoginResponse и httponly refresh-cookie.
+
+    Args:
+        response: Ответ /auth/login или /auth/refresh.
+
+    Returns:
+        Провалидированное тело ответа.
+    """
+    assert response.status_code == 200
+
+    data = response.json()
+    login_response = _LOGIN_RESPONSE.validate_python(data)
+
+    assert "access_token" in data
+    assert data["token_type"] == "bearer"
+    assert refresh_cookie(response)
+
+    return login_response
@@ -1,7 +1,11 @@
+import asyncio
+import hashlib
+import hmac
 import os
-from collections.abc import AsyncGenerator, Generator
+from collections.abc import AsyncGenerator, Callable, Generator
 
 import pytest
+import uvloop
 from dotenv import load_dotenv
 from httpx import ASGITransport, AsyncClient
 from sqlalchemy.ext.asyncio import (
@@ -12,11 +16,35 @@ from sqlalchemy.ext.asyncio import (
     create_async_engine,
 )
 
-from app.db.session import get_db
-from app.main import app
+# Настройки читаются при импорте приложения, поэтому дешевые параметры Argon2 задаются
+# до импорта app. Стойкость хэшей в тестах не нужна, а стоимость KDF доминирует в каждом
+# запросе /auth/register и /auth/login.
+os.environ.setdefault("ARGON2_TIME_COST", "1")
+os.environ.setdefault("ARGON2_MEMORY_KIB", "1024")
+
+from app.core.security import hash_password, hash_password_async  # noqa: E402
+from app.db.session import get_db  # noqa: E402
+from app.main import app  # noqa: E402
 
 load_dotenv(".env.test")
 
+TEST_PASSWORD = "test_password"
+
+
+def pytest_asyncio_loop_factories(
+    config: pytest.Config, item: pytest.Item
+) -> dict[str, Callable[[], asyncio.AbstractEventLoop]]:
+    """Запускает асинхронные тесты на uvloop, как и приложение под uvicorn.
+
+    Args:
+        config: Конфигурация pytest.
+        item: Тест, для которого выбирается фабрика event loop.
+
+    Returns:
+        Единственная фабрика event loop: uvloop.
+    """
+    return {"uvloop": uvloop.new_event_loop}
+
 
 @pytest.fixture(scope="session")
 def test_db_url() -> str:
@@ -30,6 +58,59 @@ def test_db_url() -> str:
     return url
 
 
+@pytest.fixture(scope="session")
+def cached_password_hash() -> str:
+    """Один раз за сессию хеширует канонический тестовый пароль TEST_PASSWORD."""
+    return hash_password(TEST_PASSWORD)
+
+
+@pytest.fixture(autouse=True)
+def _reuse_password_hash(cached_password_hash: str, monkeypatch: pytest.MonkeyPatch) -> None:
+    """Подменяет хеширование в сервисах: для TEST_PASSWORD отдаётся готовый хэш из сессии.
+
+    Argon2 намеренно медленный, а почти каждый тест регистрирует пользователя с одним
+    и тем же паролем. Остальные пароли хешируются как обычно.
+
+    Args:
+        cached_password_hash: Хэш TEST_PASSWORD, посчитанный один раз за сессию.
+        monkeypatch: Встроенная фикстура pytest для подмены атрибутов.
+    """
+
+    async def _hash_password_async(password: str) -> str:
+        if password == TEST_PASSWORD:
+            return cached_password_hash
+        return await hash_password_async(password)
+
+    monkeypatch.setattr("app.services.auth.hash_password_async", _hash_password_async)
+
+
+def _stub_hash(password: str) -> str:
+    """Быстрый детерминированный «хэш» для тестов, которым не важна криптостойкость."""
+    return "stub$" + hashlib.sha256(password.encode()).hexdigest()
+
+
+@pytest.fixture
+def fast_password_hashing(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Заменяет Argon2 в сервисах на SHA-256 заглушку с тем же контрактом hash/verify.
+
+    Для модулей, которые проверяют HTTP-сценарии, а не криптографию; корректность
+    Argon2 проверяется в test_security.py на настоящих функциях.
+
+    Args:
+        monkeypatch: Встроенная фикстура pytest для подмены атрибутов.
+    """
+
+    async def _hash_password_async(password: str) -> str:
+        return _stub_hash(password)
+
+    async def _verify_password_async(plain_password: str, hashed_password: str) -> bool:
+        return hmac.compare_digest(_stub_hash(plain_password), hashed_password)
+
+    monkeypatch.setattr("app.services.auth.hash_password_async", _hash_password_async)
+    monkeypatch.setattr("app.services.auth.verify_password_async", _verify_password_async)
+    monkeypatch.setattr("app.services.auth.password_needs_rehash", lambda _: False)
+
+
 @pytest.fixture(scope="session")
 def engine(test_db_url: str) -> AsyncEngine:
     """Создает AsyncEngine для тестовой базы данных.
@@ -37,40 +118,58 @@ def engine(test_db_url: str) -> AsyncEngine:
     Args:
         test_db_url: URL тестовой базы данных.
     """
-    return create_async_engine(test_db_url, future=True)
+    # Тесты остаются на Postgres: репозитории опираются на ON CONFLICT, частичные индексы
+    # и UPDATE ... RETURNING в CTE. JIT выключен, как в движке приложения.
+    return create_async_engine(
+        test_db_url,
+        future=True,
+        connect_args={"server_settings": {"jit": "off"}},
+    )
 
 
-@pytest.fixture
+@pytest.fixture(scope="session")
 async def connection(engine: AsyncEngine) -> AsyncGenerator[AsyncConnection, None]:
-    """Предоставляет одно DB-соединение (AsyncConnection) на время одного теста.
+    """Предоставляет одно DB-соединение (AsyncConnection) с внешней транзакцией на всю сессию.
+
+    Внешняя транзакция никогда не коммитится, поэтому схема создается один раз миграциями,
+    а данные тестов не переживают сессию.
 
     Args:
         engine: AsyncEngine тестовой базы данных.
 
     Yields:
-        Открытое соединение AsyncConnection.
+        Открытое соединение AsyncConnection с начатой транзакцией.
     """
     async with engine.connect() as connection:
-        yield connection
+        transaction = await connection.begin()
+        try:
+            yield connection
+        finally:
+            await transaction.rollback()
 
 
 @pytest.fixture
 async def db_session(connection: AsyncConnection) -> AsyncGenerator[AsyncSession, None]:
     """Предоставляет ORM-сессию (AsyncSession) на время одного теста и откатывает изменения.
 
+    Каждый тест работает внутри своего SAVEPOINT. Сессия открыта в режиме
+    join_transaction_mode="create_savepoint": commit() и rollback() в сервисах затрагивают
+    только вложенные SAVEPOINT, а не транзакцию теста.
+
     Args:
-        connection: DB-соединение (AsyncConnection) для текущего теста.
+        connection: DB-соединение (AsyncConnection) тестовой сессии.
 
     Yields:
         ORM-сессия AsyncSession, которую будут использовать роуты через Depends(get_db).
     """
-    transaction = await connection.begin()
+    savepoint = await connection.begin_nested()
 
     async_session_factory = async_sessionmaker(
         bind=connection,
         autoflush=False,
         expire_on_commit=False,
         class_=AsyncSession,
+        join_transaction_mode="create_savepoint",
     )
 
     session = async_session_factory()
@@ -78,7 +177,7 @@ async def db_session(connection: AsyncConnection) -> AsyncGenerator[AsyncSession
         yield session
     finally:
         await session.close()
-        await transaction.rollback()
+        await savepoint.rollback()
 
 
 @pytest.fixture
@@ -102,16 +201,75 @@ def override_get_db(db_session: AsyncSession) -> Generator[None, None, None]:
         app.dependency_overrides.clear()
 
 
+@pytest.fixture(scope="session")
+async def _http_client() -> AsyncGenerator[AsyncClient, None]:
+    """Один HTTP-клиент к приложению в памяти (без uvicorn) на всю тестовую сессию.
+
+    Yields:
+        AsyncClient поверх ASGITransport.
+    """
+    transport = ASGITransport(app=app)
+    async with AsyncClient(transport=transport, base_url="http://test") as async_client:
+        yield async_client
+
+
 @pytest.fixture
-async def client(override_get_db: None) -> AsyncGenerator[AsyncClient, None]:
+def client(_http_client: AsyncClient, override_get_db: None) -> Generator[AsyncClient, None, None]:
     """HTTP-клиент для запросов к FastAPI приложению в памяти (без uvicorn).
 
+    Клиент общий для сессии, поэтому cookies очищаются после каждого теста.
+
     Args:
+        _http_client: Общий AsyncClient тестовой сессии.
         override_get_db: Фикстура, которая гарантирует, что get_db подменён на тестовую сессию.
 
     Yields:
         AsyncClient, которым можно делать запросы к API.
     """
-    transport = ASGITransport(app=app)
-    async with AsyncClient(transport=transport, base_url="http://test") as async_client:
-        yield async_client
+    try:
+        yield _http_client
+    finally:
+        _http_client.cookies.clear()
+
+
+@pytest.fixture
+async def registered_user(client: AsyncClient) -> dict[str, str]:
+    """Регистрирует тестового пользователя через /auth/register.
+
+    Args:
+        client: HTTP-клиент приложения.
+
+    Returns:
+        Payload регистрации (email, username, password) и id созданного пользователя.
+    """
+    payload = {
+        "email": "test_email@gmail.com",
+        "username": "test_username",
+        "password": TEST_PASSWORD,
+    }
+
+    response = await client.post("/auth/register", json=payload)
+    assert response.status_code == 201
+    return {**payload, "id": response.json()["id"]}
+
+
+@pytest.fixture
+async def access_token(client: AsyncClient, registered_user: dict[str, str]) -> str:
+    """Access-токен зарегистрированного пользователя для тестов авторизованных эндпоинтов.
+
+    Args:
+        client: HTTP-клиент приложения.
+        registered_user: Зарегистрированный тестовый пользователь.
+
+    Returns:
+        Access JWT из ответа /auth/login.
+    """
+    payload = {
+        "login": registered_user["username"],
+        "password": registered_user["password"],
+    }
+
+    response = await client.post("/auth/login", json=payload)
+    assert response.status_code == 200
+    token: str = response.json()["access_token"]
+    return token
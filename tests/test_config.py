@@ -0,0 +1,24 @@
+from pathlib import Path
+
+import pytest
+
+from app.core.config import Settings, settings
+
+ENV_EXAMPLE = Path(__file__).resolve().parents[1] / ".env.example"
+
+
+def test_env_example_blank_values_use_defaults(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Пустые значения из .env.example не ломают загрузку и дают значения по умолчанию."""
+    required = {
+        name: getattr(settings, name)
+        for name, field in Settings.model_fields.items()
+        if field.is_required()
+    }
+    optional = [name for name in Settings.model_fields if name not in required]
+    for name in optional:
+        monkeypatch.delenv(name, raising=False)
+
+    loaded = Settings(_env_file=ENV_EXAMPLE, **required)
+
+    for name in optional:
+        assert getattr(loaded, name) == Settings.model_fields[name].default, name
@@ -1,197 +1,79 @@
 import pytest
+from authx import RequestToken
 from httpx import AsyncClient
-from sqlalchemy import select
+from sqlalchemy import bindparam, lambda_stmt, select
 from sqlalchemy.ext.asyncio import AsyncSession
 
+from app.core.security import auth
 from app.models.refresh_session import RefreshSession
 from app.models.user import User
-from app.schemas.auth import LoginResponse
+from app.schemas.auth import RegisterRequest
+from app.services.auth import login_user, register_user
+from tests._helpers import assert_login_ok
 
+pytestmark = pytest.mark.usefixtures("fast_password_hashing")
 
-@pytest.mark.asyncio
-async def test_successful_login_by_username(client: AsyncClient) -> None:
-    """Успешная авторизация по имени пользователя."""
-    payload_reg = {
-        "email": "test_email@gmail.com",
-        "username": "test_username",
-        "password": "test_password",
-    }
-
-    payload_log = {
-        "login": "test_username",
-        "password": "test_password",
-    }
-
-    response_reg = await client.post("/auth/register", json=payload_reg)
-    assert response_reg.status_code == 201
-
-    response_log = await client.post("/auth/login", json=payload_log)
-    assert response_log.status_code == 200
-
-    data = response_log.json()
-    set_cookie = response_log.headers.get("set-cookie", "")
-
-    LoginResponse.model_validate(data)
-
-    assert "access_token" in data
-    assert data["token_type"] == "bearer"
-
-    assert "refresh" in set_cookie.lower()
-    assert "httponly" in set_cookie.lower()
+_STMT_SESSIONS_BY_USER = lambda_stmt(
+    lambda: select(RefreshSession).where(RefreshSession.user_id == bindparam("user_id"))
+)
 
 
 @pytest.mark.asyncio
-async def test_successful_login_by_email(client: AsyncClient) -> None:
-    """Успешная авторизация по электронной почте."""
-    payload_reg = {
-        "email": "test_email@gmail.com",
-        "username": "test_username",
-        "password": "test_password",
-    }
-
-    payload_log = {
-        "login": "test_email@gmail.com",
-        "password": "test_password",
-    }
-
-    response_reg = await client.post("/auth/register", json=payload_reg)
-    assert response_reg.status_code == 201
-
-    response_log = await client.post("/auth/login", json=payload_log)
-    assert response_log.status_code == 200
-
-    data = response_log.json()
-    set_cookie = response_log.headers.get("set-cookie", "")
-    LoginResponse.model_validate(data)
-
-    assert "access_token" in data
-    assert data["token_type"] == "bearer"
-
-    assert "refresh" in set_cookie.lower()
-    assert "httponly" in set_cookie.lower()
-
-
-@pytest.mark.asyncio
-async def test_invalid_password(client: AsyncClient) -> None:
-    """Пользователь ввел неверный пароль."""
-    payload_reg = {
-        "email": "test_email@gmail.com",
-        "username": "test_username",
-        "password": "test_password",
-    }
-
-    payload_log = {
-        "login": "test_email@gmail.com",
-        "password": "test_my_password",
-    }
-
-    response_reg = await client.post("/auth/register", json=payload_reg)
-    assert response_reg.status_code == 201
-
-    response_log = await client.post("/auth/login", json=payload_log)
-    assert response_log.status_code == 401
-
-    data = response_log.json()
-
-    assert "detail" in data
-    assert data["detail"] == "Invalid credentials"
-
-
-@pytest.mark.asyncio
-async def test_no_user_by_email(client: AsyncClient) -> None:
-    """Пользователя с такой электронной почтой не существует."""
-    payload_reg = {
-        "email": "test_email@gmail.com",
-        "username": "test_username",
-        "password": "test_password",
-    }
-
+async def test_successful_login_by_username(
+    client: AsyncClient, registered_user: dict[str, str]
+) -> None:
+    """Успешная авторизация по имени пользователя."""
     payload_log = {
-        "login": "test_email@mail.com",
-        "password": "test_password",
+        "login": registered_user["username"],
+        "password": registered_user["password"],
     }
 
-    response_reg = await client.post("/auth/register", json=payload_reg)
-    assert response_reg.status_code == 201
-
     response_log = await client.post("/auth/login", json=payload_log)
-    assert response_log.status_code == 401
-
-    data = response_log.json()
-
-    assert "detail" in data
-    assert data["detail"] == "Invalid credentials"
+    assert_login_ok(response_log)
 
 
 @pytest.mark.asyncio
-async def test_no_user_by_username(client: AsyncClient) -> None:
-    """Пользователя с таким именем пользователя не существует."""
-    payload_reg = {
-        "email": "test_email@gmail.com",
-        "username": "test_username",
-        "password": "test_password",
-    }
-
+async def test_successful_login_by_email(
+    client: AsyncClient, registered_user: dict[str, str]
+) -> None:
+    """Успешная авторизация по электронной почте."""
     payload_log = {
-        "login": "test_my_username",
-        "password": "test_password",
+        "login": registered_user["email"],
+        "password": registered_user["password"],
     }
 
-    response_reg = await client.post("/auth/register", json=payload_reg)
-    assert response_reg.status_code == 201
-
     response_log = await client.post("/auth/login", json=payload_log)
-    assert response_log.status_code == 401
-
-    data = response_log.json()
-
-    assert "detail" in data
-    assert data["detail"] == "Invalid credentials"
+    assert_login_ok(response_log)
 
 
 @pytest.mark.asyncio
-async def test_invalid_format_email(client: AsyncClient) -> None:
-    """Пользователь ввел невалидный формат электронной почты."""
-    payload_reg = {
-        "email": "test_email@gmail.com",
-        "username": "test_username",
-        "password": "test_password",
-    }
-
-    payload_log = {
-        "login": "test_email_gmail.com",
-        "password": "test_password",
-    }
-
-    response_reg = await client.post("/auth/register", json=payload_reg)
-    assert response_reg.status_code == 201
-
-    response_log = await client.post("/auth/login", json=payload_log)
-    assert response_log.status_code == 401
-
-    data = response_log.json()
+async def test_access_token_subject(access_token: str, registered_user: dict[str, str]) -> None:
+    """Access-токен после входа выдан на id зарегистрированного пользователя."""
+    payload = auth.verify_token(RequestToken(token=access_token, location="headers"))
 
-    assert "detail" in data
-    assert data["detail"] == "Invalid credentials"
+    assert payload.sub == registered_user["id"]
 
 
 @pytest.mark.asyncio
-async def test_invalid_format_username(client: AsyncClient) -> None:
-    """Пользователь ввел невалидный формат имени пользователя."""
-    payload_reg = {
-        "email": "test_email@gmail.com",
-        "username": "test_username",
-        "password": "test_password",
-    }
-
+@pytest.mark.parametrize(
+    ("login", "password"),
+    [
+        pytest.param("test_email@gmail.com", "test_my_password", id="invalid_password"),
+        pytest.param("test_email@mail.com", "test_password", id="no_user_by_email"),
+        pytest.param("test_my_username", "test_password", id="no_user_by_username"),
+        pytest.param("test_email_gmail.com", "test_password", id="invalid_format_email"),
+        pytest.param("test username", "test_password", id="invalid_format_username"),
+    ],
+)
+async def test_invalid_credentials(
+    client: AsyncClient, registered_user: dict[str, str], login: str, password: str
+) -> None:
+    """Неверный пароль, несуществующий пользователь или невалидный логин дают 401."""
     payload_log = {
-        "login": "test username",
-        "password": "test_password",
+        "login": login,
+        "password": password,
     }
 
-    response_reg = await client.post("/auth/register", json=payload_reg)
-    assert response_reg.status_code == 201
-
     response_log = await client.post("/auth/login", json=payload_log)
     assert response_log.status_code == 401
 
@@ -202,9 +84,7 @@ async def test_invalid_format_username(client: AsyncClient) -> None:
 
 
 @pytest.mark.asyncio
-async def test_refresh_session_created_by_database(
-    client: AsyncClient, db_session: AsyncSession
-) -> None:
+async def test_refresh_session_created_by_database(db_session: AsyncSession) -> None:
     """В базе данных хранится только захешированный refresh_token"""
     payload_reg = {
         "email": "test_email@gmail.com",
@@ -212,30 +92,17 @@ async def test_refresh_session_created_by_database(
         "password": "test_password",
     }
 
-    payload_log = {
-        "login": "test_username",
-        "password": "test_password",
-    }
+    registered = await register_user(db_session, RegisterRequest(**payload_reg))
+    _, refresh_token = await login_user(
+        db_session, payload_reg["username"], payload_reg["password"]
+    )
 
-    response_reg = await client.post("/auth/register", json=payload_reg)
-    assert response_reg.status_code == 201
-
-    response_log = await client.post("/auth/login", json=payload_log)
-    assert response_log.status_code == 200
+    user = await db_session.get(User, registered.id, populate_existing=True)
+    assert user is not None
 
-    user_stmt = select(User).where(User.email == payload_reg["email"])
-    user_result = await db_session.execute(user_stmt)
-    user = user_result.scalar_one()
-
-    rs_stmt = select(RefreshSession).where(RefreshSession.user_id == user.id)
-    rs_result = await db_session.execute(rs_stmt)
+    rs_result = await db_session.execute(_STMT_SESSIONS_BY_USER, {"user_id": user.id})
     refresh_session = rs_result.scalar_one()
 
-    set_cookie = response_log.headers.get("set-cookie", "")
-    refresh_token = set_cookie.split("=", 1)[1].split(";", 1)[0]
-
-    assert "httponly" in set_cookie.lower()
-
     assert refresh_session.user_id == user.id
     assert refresh_session.refresh_token_hash is not None
     assert refresh_session.refresh_token_hash != refresh_token
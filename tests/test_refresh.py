@@ -0,0 +1,99 @@
+import hmac
+import uuid
+from datetime import datetime, timedelta, timezone
+from unittest.mock import AsyncMock, MagicMock, call
+
+import pytest
+from authx import TokenPayload
+from httpx import AsyncClient, Response
+
+from app.core.security import auth
+from app.models.refresh_session import RefreshSession
+from app.services.auth import _validate_refresh_session
+from app.services.errors import RefreshSessionMismatchError
+
+
+def _refresh_headers(response: Response) -> dict[str, str]:
+    """Возвращает CSRF-заголовок для refresh-токена из ответа (если CSRF-cookie включены)."""
+    csrf_token = response.cookies.get(auth.config.JWT_REFRESH_CSRF_COOKIE_NAME)
+    if csrf_token is None:
+        return {}
+    return {auth.config.JWT_REFRESH_CSRF_HEADER_NAME: csrf_token}
+
+
+@pytest.mark.asyncio
+async def test_refresh_rotates_session(client: AsyncClient) -> None:
+    """Refresh выдает новый refresh-токен, а старый больше не принимается."""
+    payload_reg = {
+        "email": "test_email@gmail.com",
+        "username": "test_username",
+        "password": "test_password",
+    }
+
+    payload_log = {
+        "login": "test_username",
+        "password": "test_password",
+    }
+
+    response_reg = await client.post("/auth/register", json=payload_reg)
+    assert response_reg.status_code == 201
+
+    response_log = await client.post("/auth/login", json=payload_log)
+    assert response_log.status_code == 200
+    old_refresh_token = response_log.cookies[auth.config.JWT_REFRESH_COOKIE_NAME]
+
+    response_refresh = await client.post("/auth/refresh", headers=_refresh_headers(response_log))
+    assert response_refresh.status_code == 200
+    assert "access_token" in response_refresh.json()
+    new_refresh_token = response_refresh.cookies[auth.config.JWT_REFRESH_COOKIE_NAME]
+    assert new_refresh_token != old_refresh_token
+
+    # Повторное использование уже отозванного refresh-токена.
+    client.cookies.set(auth.config.JWT_REFRESH_COOKIE_NAME, old_refresh_token)
+    response_replay = await client.post("/auth/refresh", headers=_refresh_headers(response_log))
+    assert response_replay.status_code == 401
+
+
+@pytest.mark.asyncio
+async def test_refresh_compares_uid_in_constant_time(
+    client: AsyncClient, registered_user: dict[str, str], monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """uid из refresh JWT сверяется с user_id сессии через hmac.compare_digest, а не ==."""
+    payload_log = {
+        "login": registered_user["username"],
+        "password": registered_user["password"],
+    }
+
+    response_log = await client.post("/auth/login", json=payload_log)
+    assert response_log.status_code == 200
+
+    spy = MagicMock(wraps=hmac.compare_digest)
+    monkeypatch.setattr("app.services.auth.hmac.compare_digest", spy)
+
+    response_refresh = await client.post("/auth/refresh", headers=_refresh_headers(response_log))
+    assert response_refresh.status_code == 200
+
+    user_id = registered_user["id"].encode()
+    assert call(user_id, user_id) in spy.call_args_list
+
+
+@pytest.mark.asyncio
+@pytest.mark.parametrize(
+    "sub",
+    [
+        pytest.param(None, id="missing_sub"),
+        pytest.param("пользователь", id="non_ascii_sub"),
+    ],
+)
+async def test_refresh_rejects_malformed_uid(sub: str | None) -> None:
+    """Отсутствующий или не-ASCII uid дает несовпадение сессии (401), а не TypeError (500)."""
+    session = RefreshSession(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        refresh_token_hash="hash",
+        expires_at=datetime.now(timezone.utc) + timedelta(days=1),
+    )
+    session_repo = MagicMock(get_active_by_hash=AsyncMock(return_value=session))
+
+    with pytest.raises(RefreshSessionMismatchError):
+        await _validate_refresh_session(session_repo, "refresh_token", TokenPayload(sub=sub))
@@ -0,0 +1,54 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+
+from app.core.config import settings
+from app.models.refresh_session import RefreshSession
+from app.services.refresh_cache import cache_session, get_cached_session, invalidate_session
+
+
+def _make_session(expires_at: datetime) -> RefreshSession:
+    """Создаёт refresh-сессию без сохранения в БД."""
+    return RefreshSession(
+        id=uuid.uuid4(),
+        user_id=uuid.uuid4(),
+        refresh_token_hash=uuid.uuid4().hex,
+        expires_at=expires_at,
+    )
+
+
+@pytest.fixture
+def cache_enabled(monkeypatch: pytest.MonkeyPatch) -> None:
+    """Включает кэш refresh-сессий на время теста."""
+    monkeypatch.setattr(settings, "REFRESH_CACHE_ENABLED", True)
+
+
+# --- Кэш активных refresh-сессий. ---
+@pytest.mark.usefixtures("cache_enabled")
+def test_cache_hit_and_invalidate() -> None:
+    """Сохранённая сессия возвращается из кэша до инвалидации."""
+    session = _make_session(datetime.now(timezone.utc) + timedelta(days=1))
+    snapshot = cache_session(session)
+
+    assert get_cached_session(session.refresh_token_hash) == snapshot
+
+    invalidate_session(session.refresh_token_hash)
+    assert get_cached_session(session.refresh_token_hash) is None
+
+
+@pytest.mark.usefixtures("cache_enabled")
+def test_cache_skips_expired_session() -> None:
+    """Истёкшая сессия не возвращается из кэша."""
+    session = _make_session(datetime.now(timezone.utc) - timedelta(seconds=1))
+    cache_session(session)
+
+    assert get_cached_session(session.refresh_token_hash) is None
+
+
+def test_cache_disabled() -> None:
+    """При выключенном кэше сессии не сохраняются."""
+    session = _make_session(datetime.now(timezone.utc) + timedelta(days=1))
+    cache_session(session)
+
+    assert get_cached_session(session.refresh_token_hash) is None
@@ -0,0 +1,55 @@
+import uuid
+from datetime import datetime, timedelta, timezone
+
+import pytest
+from httpx import AsyncClient
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from app.models.refresh_session import RefreshSession
+from app.models.user import User
+from app.repositories.refresh_session import RefreshSessionRepository
+
+
+@pytest.mark.asyncio
+async def test_delete_stale_refresh_sessions(client: AsyncClient, db_session: AsyncSession) -> None:
+    """Удаляются только сессии, истекшие или отозванные раньше границы."""
+    payload_reg = {
+        "email": "test_email@gmail.com",
+        "username": "test_username",
+        "password": "test_password",
+    }
+    response_reg = await client.post("/auth/register", json=payload_reg)
+    assert response_reg.status_code == 201
+
+    user = await db_session.get(User, uuid.UUID(response_reg.json()["id"]))
+    assert user is not None
+
+    now = datetime.now(timezone.utc)
+    cutoff = now - timedelta(days=7)
+    sessions = {
+        "active": (now + timedelta(days=30), None),
+        "recently_expired": (now - timedelta(days=1), None),
+        "recently_revoked": (now + timedelta(days=30), now - timedelta(days=1)),
+        "old_expired": (now - timedelta(days=8), None),
+        "old_revoked": (now + timedelta(days=30), now - timedelta(days=8)),
+    }
+    for name, (expires_at, revoked_at) in sessions.items():
+        db_session.add(
+            RefreshSession(
+                id=uuid.uuid4(),
+                user_id=user.id,
+                refresh_token_hash=name,
+                expires_at=expires_at,
+                revoked_at=revoked_at,
+            )
+        )
+    await db_session.flush()
+
+    deleted = await RefreshSessionRepository(db_session).delete_stale(cutoff)
+
+    rs_result = await db_session.execute(
+        select(RefreshSession.refresh_token_hash).where(RefreshSession.user_id == user.id)
+    )
+    assert deleted == 2
+    assert set(rs_result.scalars()) == {"active", "recently_expired", "recently_revoked"}
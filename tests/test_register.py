@@ -1,10 +1,15 @@
 import pytest
 from httpx import AsyncClient
-from sqlalchemy import select
+from pydantic import TypeAdapter
 from sqlalchemy.ext.asyncio import AsyncSession
 
 from app.models.user import User
-from app.schemas.auth import RegisterResponse
+from app.schemas.auth import RegisterRequest, RegisterResponse
+from app.services.auth import register_user
+
+pytestmark = pytest.mark.usefixtures("fast_password_hashing")
+
+_REGISTER_RESPONSE = TypeAdapter(RegisterResponse)
 
 
 @pytest.mark.asyncio
@@ -22,7 +27,7 @@ async def test_successful_user_registration(client: AsyncClient) -> None:
 
     data = response.json()
 
-    assert RegisterResponse.model_validate(data)
+    assert _REGISTER_RESPONSE.validate_python(data)
     assert data["email"] == payload["email"]
     assert data["username"] == payload["username"]
     assert "password_hash" not in data
@@ -100,6 +105,40 @@ async def test_username_already_exists(client: AsyncClient) -> None:
     assert data["detail"] == "username_already_exists"
 
 
+@pytest.mark.asyncio
+async def test_email_and_username_taken_by_different_users(client: AsyncClient) -> None:
+    """Email и username заняты разными пользователями. Приоритет у ошибки email."""
+    first_payload = {
+        "email": "test_first_email@gmail.com",
+        "username": "test_first_username",
+        "password": "test_first_password",
+    }
+
+    second_payload = {
+        "email": "test_second_email@gmail.com",
+        "username": "test_second_username",
+        "password": "test_second_password",
+    }
+
+    third_payload = {
+        "email": "test_first_email@gmail.com",
+        "username": "test_second_username",
+        "password": "test_third_password",
+    }
+
+    for payload in (first_payload, second_payload):
+        response = await client.post("/auth/register", json=payload)
+        assert response.status_code == 201
+
+    response_third = await client.post("/auth/register", json=third_payload)
+    assert response_third.status_code == 409
+
+    data = response_third.json()
+
+    assert "detail" in data
+    assert data["detail"] == "email_already_exists"
+
+
 @pytest.mark.asyncio
 async def test_incorrect_email_format(client: AsyncClient) -> None:
     """Некорректный формат электронной почты."""
@@ -159,7 +198,7 @@ async def test_extra_fields(client: AsyncClient) -> None:
 
 
 @pytest.mark.asyncio
-async def test_hash_password_in_database(client: AsyncClient, db_session: AsyncSession) -> None:
+async def test_hash_password_in_database(db_session: AsyncSession) -> None:
     """После регистрации в базе данных хранится захешированный пароль, а не исходный."""
     payload = {
         "email": "test_email@gmail.com",
@@ -167,12 +206,10 @@ async def test_hash_password_in_database(client: AsyncClient, db_session: AsyncS
         "password": "test_password",
     }
 
-    response = await client.post("/auth/register", json=payload)
-    assert response.status_code == 201
+    registered = await register_user(db_session, RegisterRequest(**payload))
 
-    stmt = select(User).where(User.email == payload["email"])
-    result = await db_session.execute(stmt)
-    user = result.scalar_one()
+    user = await db_session.get(User, registered.id, populate_existing=True)
 
+    assert user is not None
     assert user.password_hash is not None
     assert user.password_hash != payload["password"]
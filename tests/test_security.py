@@ -1,70 +1,132 @@
 import pytest
+from argon2 import PasswordHasher
+
+from app.core.crypto_pool import create_argon2_process_pool, hash_in_worker, verify_in_worker
+from app.core.security import (
+    ARGON2_MIN_MEMORY_KIB,
+    calibrate_argon2_memory_cost,
+    hash_password,
+    hash_password_async,
+    hash_refresh_token,
+    password_needs_rehash,
+    ph,
+    verify_password,
+    verify_password_async,
+)
 
-from app.core.security import hash_password, hash_refresh_token, verify_password
-
+# Модуль не обращается к БД, а хеширование упирается в CPU, поэтому его тесты можно
+# распределить по процессам: `pytest tests/test_security.py -n auto` (pytest-xdist).
+# Остальные модули делят одну тестовую БД и запускаются без -n.
+# Многократное хеширование, пул процессов и калибровка Argon2 помечены slow: `pytest -m "not slow"`.
 
 # --- Корректность работы функций хеширования пароля. ---
-@pytest.mark.parametrize(
-    "password",
-    [
-        "test_password",
-        "my_password",
-        "123456789",
-        "my_test_password123",
-        "@my_test12344444Password",
-    ],
-)
-def test_hash_password(password: str) -> None:
+PASSWORDS = [
+    "test_password",
+    "my_password",
+    "123456789",
+    "my_test_password123",
+    "@my_test12344444Password",
+]
+
+
+@pytest.fixture(scope="session")
+def hashed_password(request: pytest.FixtureRequest) -> tuple[str, str]:
+    """Хеширует пароль из параметра один раз и делит результат между тестами.
+
+    Args:
+        request: Запрос pytest; пароль передаётся через indirect-параметризацию.
+
+    Returns:
+        Пара (пароль, хэш).
+    """
+    password: str = request.param
+    return password, hash_password(password)
+
+
+@pytest.mark.slow
+@pytest.mark.parametrize("hashed_password", PASSWORDS, indirect=True, scope="session")
+def test_hash_password(hashed_password: tuple[str, str]) -> None:
     """Пароль успешно хешируется и корректно верифицируется."""
-    password_hash = hash_password(password)
+    password, password_hash = hashed_password
 
     assert password_hash
     assert password_hash != password
     assert verify_password(password, password_hash) is True
 
 
-@pytest.mark.parametrize(
-    "password",
-    [
-        "test_password",
-        "my_password",
-        "123456789",
-        "my_test_password123",
-        "@my_test12344444Password",
-    ],
-)
-def test_one_password_two_hashes(password: str) -> None:
+@pytest.mark.slow
+@pytest.mark.parametrize("hashed_password", PASSWORDS, indirect=True, scope="session")
+def test_one_password_two_hashes(hashed_password: tuple[str, str]) -> None:
     """Один и тот же пароль при повторном хешировании имеет разный хеш.
 
     Оба варианта хеширования корректно верифицируются.
     """
-    password_hash_first = hash_password(password)
+    password, password_hash_first = hashed_password
     password_hash_second = hash_password(password)
 
     assert password_hash_first
     assert password_hash_second
     assert password_hash_first != password_hash_second
     assert verify_password(password, password_hash_first) is True
+    assert verify_password(password, password_hash_second) is True
 
 
-@pytest.mark.parametrize(
-    "password",
-    [
-        "test_password",
-        "my_password",
-        "123456789",
-        "my_test_password123",
-        "@my_test12344444Password",
-    ],
-)
-def test_hash_password_return_type(password: str) -> None:
+@pytest.mark.slow
+@pytest.mark.parametrize("hashed_password", PASSWORDS, indirect=True, scope="session")
+def test_hash_password_return_type(hashed_password: tuple[str, str]) -> None:
     """Функия hash_password возвращает захешированный пароль типа str."""
-    password_hash = hash_password(password)
+    _, password_hash = hashed_password
 
     assert password_hash
     assert isinstance(password_hash, str)
 
 
+def test_verify_password_argon2_cffi_hash() -> None:
+    """Хэш, созданный argon2-cffi, проверяется независимо от выбранного бэкенда."""
+    password_hash = ph.hash("test_password")
+
+    assert verify_password("test_password", password_hash) is True
+    assert verify_password("other_password", password_hash) is False
+
+
+def test_password_needs_rehash() -> None:
+    """Хэш с устаревшими параметрами Argon2 требует пересчета, актуальный — нет."""
+    outdated_hash = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1).hash("test_password")
+
+    assert password_needs_rehash(hash_password("test_password")) is False
+    assert password_needs_rehash(outdated_hash) is True
+
+
+def test_password_needs_rehash_disabled_with_calibration(monkeypatch: pytest.MonkeyPatch) -> None:
+    """При калибровке memory_cost хэш при входе не пересчитывается."""
+    monkeypatch.setattr("app.core.security._REHASH_ON_LOGIN", False)
+    outdated_hash = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1).hash("test_password")
+
+    assert password_needs_rehash(outdated_hash) is False
+
+
+@pytest.mark.asyncio
+async def test_hash_password_async() -> None:
+    """Асинхронные обертки хешируют и верифицируют пароль в пуле потоков."""
+    password_hash = await hash_password_async("test_password")
+
+    assert password_hash != "test_password"
+    assert await verify_password_async("test_password", password_hash) is True
+    assert await verify_password_async("other_password", password_hash) is False
+
+
+@pytest.mark.slow
+def test_argon2_process_pool() -> None:
+    """Процессы-воркеры хешируют с параметрами основного процесса."""
+    hasher = PasswordHasher(time_cost=1, memory_cost=8, parallelism=1)
+    with create_argon2_process_pool(1, hasher) as pool:
+        password_hash = pool.submit(hash_in_worker, "test_password").result()
+
+        assert hasher.verify(password_hash, "test_password") is True
+        assert pool.submit(verify_in_worker, "test_password", password_hash).result() is True
+        assert pool.submit(verify_in_worker, "other_password", password_hash).result() is False
+
+
 # --- Корректность работы функций хеширования refresh token. ---
 @pytest.mark.parametrize(
     "refresh_token",
@@ -136,3 +198,26 @@ def test_hash_refresh_token_return_type(refresh_token: str) -> None:
 
     assert refresh_token_hash
     assert isinstance(refresh_token_hash, str)
+
+
+@pytest.mark.parametrize(
+    "refresh_token",
+    [
+        "refresh_token_first",
+        "refresh_token1",
+        "refresh_token_2",
+        "random_refresh_token",
+    ],
+)
+def test_hash_refresh_token_accepts_bytes(refresh_token: str) -> None:
+    """Refresh token в виде байтов хешируется так же, как строка."""
+    assert hash_refresh_token(refresh_token.encode()) == hash_refresh_token(refresh_token)
+
+
+# --- Калибровка параметров Argon2. ---
+@pytest.mark.slow
+def test_calibrate_argon2_memory_cost_lower_bound() -> None:
+    """При нулевом целевом времени калибровка возвращает минимальный memory_cost."""
+    memory_cost = calibrate_argon2_memory_cost(time_cost=2, parallelism=1, target_ms=0)
+
+    assert memory_cost == ARGON2_MIN_MEMORY_KIB
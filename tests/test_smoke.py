@@ -1,3 +1,8 @@
+import contextlib
+from collections.abc import AsyncIterator
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock
+
 import pytest
 from httpx import AsyncClient
 
@@ -6,3 +11,50 @@ from httpx import AsyncClient
 async def test_openapi(client: AsyncClient) -> None:
     response = await client.get("/openapi.json")
     assert response.status_code == 200
+
+
+@pytest.mark.asyncio
+async def test_health(client: AsyncClient) -> None:
+    response = await client.get("/health")
+    assert response.status_code == 200
+    assert response.json() == {"status": "ok"}
+
+
+@pytest.mark.asyncio
+async def test_health_db_caches_success(
+    client: AsyncClient, monkeypatch: pytest.MonkeyPatch
+) -> None:
+    """Успешная проверка БД кэшируется: повторная проба в пределах TTL не ходит в БД."""
+    connections: list[MagicMock] = []
+
+    @contextlib.asynccontextmanager
+    async def connect() -> AsyncIterator[MagicMock]:
+        connection = MagicMock(execute=AsyncMock())
+        connections.append(connection)
+        yield connection
+
+    monkeypatch.setattr("app.main.probe_engine", SimpleNamespace(connect=connect))
+    monkeypatch.setattr("app.main._db_healthy_until", 0.0)
+
+    first = await client.get("/health/db")
+    second = await client.get("/health/db")
+
+    assert first.status_code == second.status_code == 200
+    assert first.json() == second.json() == {"status": "ok"}
+    assert len(connections) == 1
+    connections[0].execute.assert_awaited_once()
+
+    # После истечения TTL БД проверяется снова
+    monkeypatch.setattr("app.main._db_healthy_until", 0.0)
+    third = await client.get("/health/db")
+
+    assert third.status_code == 200
+    assert len(connections) == 2
+
+
+@pytest.mark.asyncio
+async def test_openapi_register_email_schema(client: AsyncClient) -> None:
+    response = await client.get("/openapi.json")
+    email = response.json()["components"]["schemas"]["RegisterRequest"]["properties"]["email"]
+    assert email["format"] == "email"
+    assert email["maxLength"] == 255